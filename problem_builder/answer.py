@@ -20,6 +20,7 @@
 # Imports ###########################################################
 import logging
 import uuid
+from collections import defaultdict
 
 import pkg_resources
 from django import utils
@@ -73,27 +74,21 @@ class AnswerMixin(XBlockWithPreviewMixin, XBlockWithTranslationServiceMixin, Stu
         except AttributeError:
             return self.scope_ids.user_id
 
-    def get_model_object(self, name=None):
+    # The student inputs of this and other answers on the same page, keyed by name, if loaded by prefetch_answers()
+    prefetched_answers = None
+
+    def get_answer_input(self, name):
         """
-        Fetches the Answer model object for the answer named `name`
+        Get the student input of the answer named `name`, without creating an Answer if there isn't one.
         """
-        # By default, get the model object for the current answer's name
-        if not name:
-            name = self.name
-        # Consistency check - we should have a name by now
-        if not name:
-            raise ValueError('AnswerBlock.name field need to be set to a non-null/empty value')
-
-        student_id = self._get_student_id()
-        course_key = self._get_course_id()
-
-        answer_data, _ = Answer.objects.get_or_create(
-            student_id=student_id,
-            course_key=course_key,
+        if self.prefetched_answers is not None and name in self.prefetched_answers:
+            return self.prefetched_answers[name]
+        student_input = Answer.objects.filter(
+            student_id=self._get_student_id(),
+            course_key=self._get_course_id(),
             name=name,
-        )
-
-        return answer_data
+        ).values_list('student_input', flat=True).first()
+        return student_input or ''
 
     @XBlock.json_handler
     def answer_value(self, data, suffix=''):
@@ -106,6 +101,15 @@ class AnswerMixin(XBlockWithPreviewMixin, XBlockWithTranslationServiceMixin, Stu
         frag = self.mentoring_view({})
         return {'html': frag.content}
 
+    @lazy
+    def saved_student_input(self):
+        """
+        The student input value currently stored for this answer, without any default.
+        """
+        if not self.name:
+            return ''
+        return self.get_answer_input(self.name)
+
     @lazy
     def student_input(self):
         """
@@ -117,11 +121,11 @@ class AnswerMixin(XBlockWithPreviewMixin, XBlockWithTranslationServiceMixin, Stu
         if not self.name:
             return ''
 
-        student_input = self.get_model_object().student_input
+        student_input = self.saved_student_input
 
         # Default value can be set from another answer's current value
         if not student_input and hasattr(self, 'default_from') and self.default_from:
-            student_input = self.get_model_object(name=self.default_from).student_input
+            student_input = self.get_answer_input(self.default_from)
 
         return student_input
 
@@ -138,6 +142,30 @@ class AnswerMixin(XBlockWithPreviewMixin, XBlockWithTranslationServiceMixin, Stu
             add_error("A Question ID is required.")
 
 
+def prefetch_answers(blocks):
+    """
+    Load the student inputs of all answer (and answer recap) blocks in `blocks` read-only, with one query
+    per student and course, instead of one or two get_or_create queries per block.
+    """
+    blocks_by_owner = defaultdict(list)
+    for block in blocks:
+        if isinstance(block, AnswerMixin) and block.name:
+            blocks_by_owner[(block._get_student_id(), block._get_course_id())].append(block)
+
+    for (student_id, course_key), owner_blocks in blocks_by_owner.items():
+        names = {block.name for block in owner_blocks}
+        names.update(getattr(block, 'default_from', None) for block in owner_blocks)
+        names.discard(None)
+        answers = dict.fromkeys(names, '')
+        answers.update(Answer.objects.filter(
+            student_id=student_id,
+            course_key=course_key,
+            name__in=names,
+        ).values_list('name', 'student_input'))
+        for block in owner_blocks:
+            block.prefetched_answers = answers
+
+
 @XBlock.needs("i18n")
 class AnswerBlock(SubmittingXBlockMixin, AnswerMixin, QuestionMixin, StudioEditableXBlockMixin,
                   XBlock, ExpandStaticURLMixin):
@@ -233,14 +261,15 @@ class AnswerBlock(SubmittingXBlockMixin, AnswerMixin, QuestionMixin, StudioEdita
         block. Update accordingly.
         """
         self.student_input = submission['value'].strip()
+        changed = self.student_input != self.saved_student_input
         self.save()
 
-        if sub_api:
+        if sub_api and changed:
             # Also send to the submissions API:
             item_key = self.student_item_key
             # Need to do this by our own ID, since an answer can be referred to multiple times.
             item_key['item_id'] = self.name
-            sub_api.create_submission(item_key, self.student_input)
+            self.create_submission(self.student_input, item_key)
 
         log_message = f'Answer submitted for`{self.name}`: "{self.student_input}"'
         log.info(log_message)
@@ -268,12 +297,12 @@ class AnswerBlock(SubmittingXBlockMixin, AnswerMixin, QuestionMixin, StudioEdita
         if not student_id:
             return  # save() gets called from the workbench homepage sometimes when there is no student ID
 
-        # Only attempt to locate a model object for this block when the answer has a name
-        if self.name:
-            answer_data = self.get_model_object()
-            if answer_data.student_input != self.student_input:
-                answer_data.student_input = self.student_input
-                answer_data.save()
+        # Only attempt to store the answer when it has a name, and has changed
+        if self.name and self.student_input != self.saved_student_input:
+            Answer.save_student_input(student_id, self._get_course_id(), self.name, self.student_input)
+            self.saved_student_input = self.student_input
+            if self.prefetched_answers is not None:
+                self.prefetched_answers[self.name] = self.student_input
 
     @classmethod
     def get_template(cls, template_id):
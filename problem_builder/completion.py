@@ -197,7 +197,7 @@ class CompletionBlock(
         self.student_value = value
         if sub_api:
             # Also send to the submissions API:
-            sub_api.create_submission(self.student_item_key, value)
+            self.create_submission(value)
         result = self.get_last_result()
         log.debug('Completion submission result: %s', result)
         return result
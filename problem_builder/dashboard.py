@@ -29,6 +29,7 @@ import ast
 import json
 import logging
 import operator as op
+from functools import lru_cache
 
 from django.template.defaultfilters import floatformat
 from lazy import lazy
@@ -42,13 +43,16 @@ from xblockutils.studio_editable import StudioEditableXBlockMixin
 
 from .dashboard_visual import DashboardVisualData
 from .mcq import MCQBlock
-from .sub_api import sub_api
+from .sub_api import get_latest_answers
 
 # Globals ###########################################################
 
 log = logging.getLogger(__name__)
 loader = ResourceLoader(__name__)
 
+# The number of distinct color rule strings to keep compiled in each process
+COLOR_RULES_CACHE_SIZE = 128
+
 
 def _(text):
     """ A no-op to mark strings that we need to translate """
@@ -105,9 +109,9 @@ class ColorRule:
         Instantiate a ColorRule with the given rule expression string and color value.
         """
         try:
-            self._rule_parsed = ast.parse(rule_str, mode='eval').body
-            # Once it's been parsed, also try evaluating it with a test value:
-            self._safe_eval_expression(self._rule_parsed, x=0)
+            self._rule_compiled = self._compile_expression(ast.parse(rule_str, mode='eval').body)
+            # Once it's been compiled, also try evaluating it with a test value:
+            self._rule_compiled(0)
         except (TypeError, SyntaxError) as e:
             raise ValueError(f"Invalid Expression: {e}") from e
         except ZeroDivisionError:
@@ -117,12 +121,12 @@ class ColorRule:
     def matches(self, x):
         """ Does this rule apply for the value x? """
         try:
-            return bool(self._safe_eval_expression(self._rule_parsed, x))
+            return bool(self._rule_compiled(x))
         except ZeroDivisionError:
             return False
 
-    @staticmethod
-    def _safe_eval_expression(expr, x=0):
+    @classmethod
+    def _safe_eval_expression(cls, expr, x=0):
         """
         Safely evaluate a mathematical or boolean expression involving the value x
 
@@ -137,6 +141,19 @@ class ColorRule:
         The expression can only contain: numbers, mathematical operators, boolean operators,
         comparisons, and a placeholder variable called "x"
         """
+        if not isinstance(expr, ast.AST):
+            expr = ast.parse(expr, mode='eval').body
+        return cls._compile_expression(expr)(x)
+
+    @staticmethod
+    def _compile_expression(expr):
+        """
+        Compile the syntax tree of an expression involving the value x into a function of x.
+
+        The tree is checked and walked only once; the result is a tree of closures that can be called for
+        many values of x. Raises TypeError if the expression contains anything not allowed by
+        _safe_eval_expression.
+        """
         # supported operators:
         operators = {
             # Allow +, -, *, /, %, negative:
@@ -145,39 +162,97 @@ class ColorRule:
             ast.Eq: op.eq, ast.NotEq: op.ne, ast.Lt: op.lt, ast.LtE: op.le, ast.Gt: op.gt, ast.GtE: op.ge,
         }
 
-        def eval_(node):
-            """ Recursive evaluation of syntax tree node 'node' """
+        def operator_for(node):
+            """ Get the function implementing operator node 'node' """
+            try:
+                return operators[type(node)]
+            except KeyError as err:
+                raise TypeError(node) from err
+
+        def compile_(node):
+            """ Recursive compilation of syntax tree node 'node' """
             if isinstance(node, ast.Num):  # <number>
-                return node.n
+                value = node.n
+                return lambda x: value
             elif isinstance(node, ast.BinOp):  # <left> <operator> <right>
-                return operators[type(node.op)](eval_(node.left), eval_(node.right))
+                binary_op, left, right = operator_for(node.op), compile_(node.left), compile_(node.right)
+                return lambda x: binary_op(left(x), right(x))
             elif isinstance(node, ast.UnaryOp):  # <operator> <operand> e.g., -1
-                return operators[type(node.op)](eval_(node.operand))
+                unary_op, operand = operator_for(node.op), compile_(node.operand)
+                return lambda x: unary_op(operand(x))
             elif isinstance(node, ast.Name) and node.id == "x":
-                return x
+                return lambda x: x
             elif isinstance(node, ast.BoolOp):  # Boolean operator: either "and" or "or" with two or more values
+                values = [compile_(val) for val in node.values]
                 if isinstance(node.op, ast.And):
-                    return all(eval_(val) for val in node.values)
-                else:  # Or:
-                    for val in node.values:
-                        result = eval_(val)
+                    return lambda x: all(val(x) for val in values)
+
+                def or_(x):
+                    for val in values:
+                        result = val(x)
                         if result:
                             return result
                     return result  # or returns the final value even if it's falsy
+                return or_
             elif isinstance(node, ast.Compare):  # A comparison expression, e.g. "3 > 2" or "5 < x < 10"
-                left = eval_(node.left)
-                for comparison_op, right_expr in zip(node.ops, node.comparators):
-                    right = eval_(right_expr)
-                    if not operators[type(comparison_op)](left, right):
-                        return False
-                    left = right
-                return True
+                first = compile_(node.left)
+                comparisons = [
+                    (operator_for(comparison_op), compile_(right_expr))
+                    for comparison_op, right_expr in zip(node.ops, node.comparators)
+                ]
+
+                def compare(x):
+                    left = first(x)
+                    for comparison_op, right_expr in comparisons:
+                        right = right_expr(x)
+                        if not comparison_op(left, right):
+                            return False
+                        left = right
+                    return True
+                return compare
             else:
                 raise TypeError(node)
 
-        if not isinstance(expr, ast.AST):
-            expr = ast.parse(expr, mode='eval').body
-        return eval_(expr)
+        return compile_(expr)
+
+
+def parse_color_rules(color_rules_str, ignore_errors=True):
+    """
+    Parse the color rules. Returns a list of ColorRule objects.
+
+    Color rules are like: "0 < x < 4: red" or "blue" (for a catch-all rule)
+    """
+    rules = []
+    for lineno, line in enumerate(color_rules_str.splitlines()):
+        line = line.strip()
+        if line:
+            try:
+                if ":" in line:
+                    condition, value = line.split(':')
+                    value = value.strip()
+                    if condition.isnumeric():  # A condition just listed as an exact value
+                        condition = "x == " + condition
+                else:
+                    condition = "1"  # Always true
+                    value = line
+                rules.append(ColorRule(condition, value))
+            except ValueError as err:
+                if ignore_errors:
+                    continue
+                raise ValueError(
+                    _("Invalid color rule on line {line_number}").format(line_number=lineno + 1)
+                ) from err
+    return rules
+
+
+@lru_cache(maxsize=COLOR_RULES_CACHE_SIZE)
+def get_color_rules(color_rules_str):
+    """
+    Get the compiled ColorRules for the given color rules string, ignoring invalid rules.
+
+    The result is cached per process, so that each distinct set of rules is only compiled once.
+    """
+    return tuple(parse_color_rules(color_rules_str))
 
 
 class InvalidUrlName(ValueError):
@@ -322,34 +397,14 @@ class DashboardBlock(StudioEditableXBlockMixin, ExportMixin, XBlock):
 
         Color rules are like: "0 < x < 4: red" or "blue" (for a catch-all rule)
         """
-        rules = []
-        for lineno, line in enumerate(color_rules_str.splitlines()):
-            line = line.strip()
-            if line:
-                try:
-                    if ":" in line:
-                        condition, value = line.split(':')
-                        value = value.strip()
-                        if condition.isnumeric():  # A condition just listed as an exact value
-                            condition = "x == " + condition
-                    else:
-                        condition = "1"  # Always true
-                        value = line
-                    rules.append(ColorRule(condition, value))
-                except ValueError as err:
-                    if ignore_errors:
-                        continue
-                    raise ValueError(
-                        _("Invalid color rule on line {line_number}").format(line_number=lineno + 1)
-                    ) from err
-        return rules
+        return parse_color_rules(color_rules_str, ignore_errors)
 
     @lazy
     def color_rules_parsed(self):
         """
-        Caching property to get parsed color rules. Returns a list of ColorRule objects.
+        Caching property to get parsed color rules. Returns a sequence of ColorRule objects.
         """
-        return self.parse_color_rules_str(self.color_rules) if self.color_rules else []
+        return get_color_rules(self.color_rules) if self.color_rules else ()
 
     def _get_submission_key(self, usage_key):
         """
@@ -365,15 +420,26 @@ class DashboardBlock(StudioEditableXBlockMixin, ExportMixin, XBlock):
 
     def color_for_value(self, value):
         """ Given a string value, get the color rule that matches, if any """
-        if isinstance(value, str):
-            if value.isnumeric():
-                value = float(value)
-            else:
-                return None
-        for rule in self.color_rules_parsed:
-            if rule.matches(value):
-                return rule.color_str
-        return None
+        return self.colors_for_values([value])[0]
+
+    def colors_for_values(self, values):
+        """
+        Given a list of values, get the color of the rule that matches each of them, if any.
+
+        Each distinct value is only classified once. None values get no color.
+        """
+        rules = self.color_rules_parsed
+        colors = {None: None}
+        for value in values:
+            if value in colors:
+                continue
+            number = value
+            if isinstance(value, str):
+                number = float(value) if value.isnumeric() else None
+            colors[value] = None if number is None else next(
+                (rule.color_str for rule in rules if rule.matches(number)), None
+            )
+        return [colors[value] for value in values]
 
     def _get_problem_questions(self, mentoring_block):
         """ Generator returning only children of specified block that are MCQs """
@@ -381,6 +447,35 @@ class DashboardBlock(StudioEditableXBlockMixin, ExportMixin, XBlock):
             if child_isinstance(mentoring_block, child_id, MCQBlock):
                 yield child_id
 
+    def _get_visible_questions(self, mentoring_block):
+        """ Generator returning the MCQs of the specified block that are not excluded from the dashboard """
+        try:
+            hide_questions = self.exclude_questions.get(mentoring_block.url_name, [])
+        except Exception:  # pylint: disable=broad-except-clause
+            log.exception("Cannot parse exclude_questions setting - probably malformed: %s", self.exclude_questions)
+            hide_questions = []
+
+        for question_number, child_id in enumerate(self._get_problem_questions(mentoring_block), 1):
+            try:
+                if question_number in hide_questions:
+                    continue
+            except TypeError:
+                log.exception(
+                    "Cannot check question number - expected list of ints got: %s",
+                    hide_questions
+                )
+            yield child_id
+
+    def _get_latest_answers(self, usage_keys):
+        """
+        Get the student's submitted answers to the specified MCQs from the submissions API, with one query.
+
+        Returns a dict mapping the usage key of each MCQ to its latest answer, or None if there is none.
+        """
+        usage_keys = list(usage_keys)
+        student_items = [self._get_submission_key(usage_key) for usage_key in usage_keys]
+        return dict(zip(usage_keys, get_latest_answers(student_items)))
+
     @XBlock.supports("multi_device")  # Mark as mobile-friendly
     def student_view(self, context=None):  # pylint: disable=unused-argument
         """
@@ -389,43 +484,29 @@ class DashboardBlock(StudioEditableXBlockMixin, ExportMixin, XBlock):
         if not self.mentoring_ids:
             return Fragment(f'<h1>{self.display_name}</h1><p>{_("Not configured.")}</p>')
 
-        blocks = []
+        # Gather the MCQs to show first, so that the student's answers to all of them can be loaded at once:
+        mentoring_mcqs = []
         for mentoring_block in self.get_mentoring_blocks(self.mentoring_ids):
             if mentoring_block is None:
                 continue
+            mentoring_mcqs.append((mentoring_block, list(self._get_visible_questions(mentoring_block))))
+        answers = self._get_latest_answers(
+            child_id for _mentoring_block, mcq_ids in mentoring_mcqs for child_id in mcq_ids
+        )
+
+        blocks = []
+        for mentoring_block, mcq_ids in mentoring_mcqs:
             block = {
                 'display_name': mentoring_block.display_name,
                 'mcqs': []
             }
-            try:
-                hide_questions = self.exclude_questions.get(mentoring_block.url_name, [])
-            except Exception:  # pylint: disable=broad-except-clause
-                log.exception("Cannot parse exclude_questions setting - probably malformed: %s", self.exclude_questions)
-                hide_questions = []
-
-            for question_number, child_id in enumerate(self._get_problem_questions(mentoring_block), 1):
-                try:
-                    if question_number in hide_questions:
-                        continue
-                except TypeError:
-                    log.exception(
-                        "Cannot check question number - expected list of ints got: %s",
-                        hide_questions
-                    )
-
-                # Get the student's submitted answer to this MCQ from the submissions API:
+            for child_id in mcq_ids:
                 mcq_block = self.runtime.get_block(child_id)
-                mcq_submission_key = self._get_submission_key(child_id)
-                try:
-                    value = sub_api.get_submissions(mcq_submission_key, limit=1)[0]["answer"]
-                except IndexError:
-                    value = None
-
+                value = answers.get(child_id)
                 block['mcqs'].append({
                     "display_name": mcq_block.display_name_with_default,
                     "value": value,
                     "accessible_value": _("Score: {score}").format(score=value) if value else _("No value yet"),
-                    "color": self.color_for_value(value) if value is not None else None,
                 })
             # If the values are numeric, display an average:
             numeric_values = [
@@ -441,9 +522,19 @@ class DashboardBlock(StudioEditableXBlockMixin, ExportMixin, XBlock):
                 )
                 block['average_label'] = self.average_labels.get(mentoring_block.url_name, _("Average"))
                 block['has_average'] = True
-                block['average_color'] = self.color_for_value(average_value)
             blocks.append(block)
 
+        # Classify all of the values shown on this dashboard at once:
+        mcqs = [mcq for block in blocks for mcq in block['mcqs']]
+        averaged_blocks = [block for block in blocks if block.get('has_average')]
+        colors = self.colors_for_values(
+            [mcq['value'] for mcq in mcqs] + [block['average'] for block in averaged_blocks]
+        )
+        for item, color in zip(mcqs, colors):
+            item['color'] = color
+        for block, color in zip(averaged_blocks, colors[len(mcqs):]):
+            block['average_color'] = color
+
         visual_repr = None
         if self.visual_rules:
             try:
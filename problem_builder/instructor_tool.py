@@ -37,6 +37,9 @@ loader = ResourceLoader(__name__)
 
 PAGE_SIZE = 15
 
+# Number of sets of export parameters to remember the time of the last export with, for incremental exports.
+MAX_EXPORT_TIMESTAMPS = 10
+
 # URL Path to the Course Blocks REST API.
 # Note that we add a trailing slash to avoid the API's redirect hit.
 COURSE_BLOCKS_API = '/api/courses/v1/blocks/'
@@ -67,15 +70,35 @@ class InstructorToolBlock(XBlock, I18NService, TranslationContentMixin, XBlockWi
         default="",
         scope=Scope.user_state,
     )
+    active_export_shard_ids = List(
+        # The UUIDs of the celery AsyncResults for the shards of the most recent export,
+        # IF we are still waiting for them to be merged
+        default=[],
+        scope=Scope.user_state,
+    )
     last_export_result = Dict(
         # The info dict returned by the most recent successful export.
         # If the export failed, it will have an "error" key set.
         default=None,
         scope=Scope.user_state,
     )
+    active_export_key = String(
+        # The parameters of the most recent export, as a key of last_export_timestamps,
+        # IF we are still waiting for it to finish
+        default="",
+        scope=Scope.user_state,
+    )
+    last_export_timestamps = Dict(
+        # The start time of the most recent successful export with each of the last MAX_EXPORT_TIMESTAMPS
+        # sets of parameters (see _get_export_key). Incremental exports only include submissions made after
+        # the last export with the same parameters.
+        default={},
+        scope=Scope.user_state,
+    )
     display_data = List(
-        # The list of results associated with the most recent successful export.
-        # Stored separately to avoid the overhead of sending it to the client.
+        # The list of results associated with the most recent successful export, for exports made
+        # before results were paged straight from the report. Stored separately to avoid the overhead
+        # of sending it to the client.
         default=None,
         scope=Scope.user_state,
     )
@@ -108,29 +131,70 @@ class InstructorToolBlock(XBlock, I18NService, TranslationContentMixin, XBlockWi
             if async_result.ready():
                 self._save_result(async_result)
 
+    @staticmethod
+    def _get_export_key(root_block_id, block_types, user_ids):
+        """
+        Get a key identifying the submissions that an export with the given parameters includes.
+
+        Searches for a `match_string` are not exported incrementally, so it isn't part of the key.
+        """
+        return json.dumps([root_block_id, sorted(block_types), sorted(user_ids or [])])
+
     def _save_result(self, task_result):
         """ Given an AsyncResult or EagerResult, save it. """
         self.active_export_task_id = ''
+        self.active_export_shard_ids = []
         if task_result.successful():
+            if isinstance(task_result.result, dict) and task_result.result.get('merge_task_id'):
+                # The export has been split into shards; wait for the task that merges them.
+                self.active_export_task_id = task_result.result['merge_task_id']
+                self.active_export_shard_ids = task_result.result['shard_task_ids']
+                return
+            export_key, self.active_export_key = self.active_export_key, ''
             if isinstance(task_result.result, dict) and not task_result.result.get('error'):
-                self.display_data = task_result.result['display_data']
-                del task_result.result['display_data']
+                self.display_data = task_result.result.pop('display_data', None)
                 self.last_export_result = task_result.result
+                if export_key:
+                    timestamps = dict(
+                        self.last_export_timestamps, **{export_key: task_result.result['start_timestamp']}
+                    )
+                    # Forget the parameters that were least recently exported with.
+                    self.last_export_timestamps = dict(
+                        sorted(timestamps.items(), key=lambda item: item[1])[-MAX_EXPORT_TIMESTAMPS:]
+                    )
             else:
                 self.last_export_result = {'error': f'Unexpected result: {repr(task_result.result)}'}
                 self.display_data = None
         else:
+            self.active_export_key = ''
             self.last_export_result = {'error': str(task_result.result)}
             self.display_data = None
 
     @XBlock.json_handler
     def get_result_page(self, data, suffix=''):
         """ Return requested page of `last_export_result`. """
-        paginator = Paginator(self.display_data, PAGE_SIZE)
         page = data.get('page', None)
+        if self.display_data is not None:
+            paginator = Paginator(self.display_data, PAGE_SIZE)
+            return {
+                'display_data': paginator.page(page).object_list,
+                'num_results': len(self.display_data),
+                'page_size': PAGE_SIZE
+            }
+        # Only read the rows of the requested page from the report.
+        num_results = self.last_export_result['num_results']
+        rows = Paginator(range(num_results), PAGE_SIZE).page(page).object_list
+        from .tasks import \
+            read_report_rows  # Import here since this is edX LMS specific
         return {
-            'display_data': paginator.page(page).object_list,
-            'num_results': len(self.display_data),
+            'display_data': read_report_rows(
+                getattr(self.scope_ids.usage_id, 'course_key', None),
+                self.last_export_result['report_filename'],
+                self.last_export_result['index_filename'],
+                rows.start,
+                len(rows),
+            ) if rows else [],
+            'num_results': num_results,
             'page_size': PAGE_SIZE
         }
 
@@ -171,10 +235,28 @@ class InstructorToolBlock(XBlock, I18NService, TranslationContentMixin, XBlockWi
         course_key = getattr(self.scope_ids.usage_id, 'course_key', None)
         return dict(report_store.links_for(course_key)).get(self.last_export_result['report_filename'])
 
+    def _get_export_progress(self):
+        """
+        If we're waiting for the shards of an export, return how many of them have finished.
+        """
+        if not self.active_export_shard_ids:
+            return None
+        from .tasks import \
+            export_data as \
+            export_data_task  # Import here since this is edX LMS specific
+        completed = sum(
+            1 for task_id in self.active_export_shard_ids if export_data_task.AsyncResult(task_id).ready()
+        )
+        return {
+            'completed': completed,
+            'total': len(self.active_export_shard_ids),
+        }
+
     def _get_status(self):
         self.check_pending_export()
         return {
             'export_pending': bool(self.active_export_task_id),
+            'export_progress': self._get_export_progress(),
             'last_export_result': self.last_export_result,
             'download_url': self.download_url_for_last_report,
         }
@@ -202,6 +284,8 @@ class InstructorToolBlock(XBlock, I18NService, TranslationContentMixin, XBlockWi
         self.last_export_result = None
         self.display_data = None
         self.active_export_task_id = ''
+        self.active_export_shard_ids = []
+        self.active_export_key = ''
 
     @XBlock.json_handler
     def start_export(self, data, suffix=''):
@@ -210,6 +294,7 @@ class InstructorToolBlock(XBlock, I18NService, TranslationContentMixin, XBlockWi
         usernames = data.get('usernames', None)
         root_block_id = data.get('root_block_id', None)
         match_string = data.get('match_string', None)
+        incremental = data.get('incremental', False)
 
         # Process user-submitted data
         if block_types == 'all':
@@ -242,6 +327,9 @@ class InstructorToolBlock(XBlock, I18NService, TranslationContentMixin, XBlockWi
             export_data as \
             export_data_task  # Import here since this is edX LMS specific
         self._delete_export()
+        if not match_string:
+            # Only keep track of exports of all of the answers, which can be repeated incrementally.
+            self.active_export_key = self._get_export_key(root_block_id, block_types, user_ids)
         # Make sure we nail down our state before sending off an asynchronous task.
         self.save()
         async_result = export_data_task.delay(
@@ -251,6 +339,8 @@ class InstructorToolBlock(XBlock, I18NService, TranslationContentMixin, XBlockWi
             block_types,
             user_ids,
             match_string,
+            # Only export submissions made since the last export with the same parameters, if requested.
+            self.last_export_timestamps.get(self.active_export_key) if incremental and not match_string else None,
         )
         if async_result.ready():
             # In development mode, the task may have executed synchronously.
@@ -267,12 +357,21 @@ class InstructorToolBlock(XBlock, I18NService, TranslationContentMixin, XBlockWi
 
     @XBlock.json_handler
     def cancel_export(self, request, suffix=''):
+        from .tasks import delete_export_parts
         from .tasks import \
             export_data as \
             export_data_task  # Import here since this is edX LMS specific
         if self.active_export_task_id:
-            async_result = export_data_task.AsyncResult(self.active_export_task_id)
-            async_result.revoke()
+            # Revoke the export (or the task merging its shards), as well as any of its shards.
+            # Terminate running shards, so that they don't store their partial reports after they're deleted.
+            for task_id in [self.active_export_task_id] + self.active_export_shard_ids:
+                async_result = export_data_task.AsyncResult(task_id)
+                async_result.revoke(terminate=task_id in self.active_export_shard_ids)
+            if self.active_export_shard_ids:
+                # The ID of the merge task identifies the partial reports of the shards.
+                delete_export_parts.delay(
+                    str(getattr(self.runtime, 'course_id', 'course_id')), self.active_export_task_id
+                )
             self._delete_export()
 
     def _get_user_attr(self, attr):
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from problem_builder.mcq import MCQBlock, RatingBlock
+from problem_builder.slider import SliderBlock
+from problem_builder.sub_api import sub_api
+
+
+class Command(BaseCommand):
+    """
+    Recompute the AnswerAggregate of every MCQ, Rating and Slider block in the given courses from
+    the latest submissions of all students in the submissions API.
+
+    Aggregates are kept up to date as students submit answers once they have been built, so this only
+    needs to be run to start aggregating the answers to a course's questions, after the choices of a
+    question have been changed, or after the submissions of a student have been reset. Until then,
+    plots compute the average answers to these questions from the submissions.
+    """
+    help = 'Recompute the aggregated answers to MCQ, Rating and Slider blocks from the submissions API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'course_ids',
+            help='The IDs of the courses to rebuild the aggregates of.',
+            nargs='+',
+        )
+
+    def handle(self, *args, **options):
+        # Import here since these are only available in the LMS:
+        from opaque_keys import InvalidKeyError
+        from opaque_keys.edx.keys import CourseKey
+        from xmodule.modulestore.django import modulestore
+
+        if sub_api is None:
+            raise CommandError("The submissions API is not available.")
+
+        for course_id in options['course_ids']:
+            try:
+                course_key = CourseKey.from_string(course_id)
+            except InvalidKeyError as err:
+                raise CommandError(f"Invalid course ID: {course_id}") from err
+            num_blocks = 0
+            for block_type in (MCQBlock.CATEGORY, RatingBlock.CATEGORY, SliderBlock.CATEGORY):
+                for block in modulestore().get_items(course_key, qualifiers={'category': block_type}):
+                    location = block.location.replace(branch=None, version=None)  # Like student_item_key
+                    block.rebuild_answer_aggregate({
+                        'course_id': str(location.course_key),
+                        'item_id': str(location),
+                        'item_type': block.scope_ids.block_type,
+                    })
+                    num_blocks += 1
+            self.stdout.write(f"Rebuilt the answer aggregates of {num_blocks} blocks in {course_id}")
@@ -21,6 +21,7 @@
 
 import logging
 
+from lazy import lazy
 from web_fragments.fragment import Fragment
 from xblock.fields import List, Scope, String
 from xblock.validation import ValidationMessage
@@ -52,6 +53,7 @@ class MCQBlock(SubmittingXBlockMixin, StudentViewUserStateMixin, QuestionnaireAb
     CATEGORY = 'pb-mcq'
     STUDIO_LABEL = _("Multiple Choice Question")
     USER_STATE_FIELDS = ['num_attempts', 'student_choice']
+    aggregate_answers = True  # PlotBlock displays the average answer
 
     message = String(
         display_name=_("Message"),
@@ -78,6 +80,13 @@ class MCQBlock(SubmittingXBlockMixin, StudentViewUserStateMixin, QuestionnaireAb
     )
     editable_fields = QuestionnaireAbstractBlock.editable_fields + ('message', 'correct_choices',)
 
+    @lazy
+    def has_numeric_answers(self):
+        """
+        Whether the label of any choice is a number, and so counts in the AnswerAggregate
+        """
+        return any(self.get_aggregate_value(value) is not None for value in self.all_choice_values)
+
     def describe_choice_correctness(self, choice_value):
         if choice_value in self.correct_choices:
             if len(self.correct_choices) == 1:
@@ -90,24 +99,12 @@ class MCQBlock(SubmittingXBlockMixin, StudentViewUserStateMixin, QuestionnaireAb
             return self._("Not Acceptable")
 
     def calculate_results(self, submission):
+        """
+        Evaluate `submission`. This has no side effects, so it is also used to show previous results.
+        """
         correct = submission in self.correct_choices
-        tips_html = []
-        for tip in self.get_tips():
-            if submission in tip.values:
-                tips_html.append(tip.render('mentoring_view').content)
-
-        formatted_tips = None
-
-        if tips_html:
-            formatted_tips = loader.render_django_template('templates/html/tip_choice_group.html', {
-                'tips_html': tips_html,
-            })
-
-        self.student_choice = submission
-
-        if sub_api:
-            # Also send to the submissions API:
-            sub_api.create_submission(self.student_item_key, submission)
+        tips = self.tips_by_value.get(submission)
+        formatted_tips = self.render_tips(tips) if tips else None
 
         return {
             'submission': submission,
@@ -128,6 +125,11 @@ class MCQBlock(SubmittingXBlockMixin, StudentViewUserStateMixin, QuestionnaireAb
         log.debug('Received MCQ submission: "%s"', submission)
         result = self.calculate_results(submission['value'])
         self.student_choice = submission['value']
+
+        if sub_api:
+            # Also send to the submissions API:
+            self.create_submission(submission['value'])
+
         log.debug('MCQ submission result: %s', result)
         return result
 
@@ -220,11 +222,11 @@ class RatingBlock(MCQBlock):
     )
     editable_fields = MCQBlock.editable_fields + ('low', 'high')
 
-    @property
+    @lazy
     def all_choice_values(self):
         return self.FIXED_VALUES + [c.value for c in self.custom_choices]
 
-    @property
+    @lazy
     def human_readable_choices(self):
         display_names = [f"1 - {self.low}", "2", "3", "4", f"5 - {self.high}"]
         return [
@@ -48,12 +48,15 @@ from problem_builder.swipe import SwipeBlock
 from problem_builder.table import MentoringTableBlock
 
 from .message import MentoringMessageBlock, get_message_label
-from .mixins import (ExpandStaticURLMixin, MessageParentMixin, QuestionMixin,
-                     StepParentMixin, StudentViewUserStateMixin,
+from .mixins import (ExpandStaticURLMixin, MessageParentMixin,
+                     PrefetchChildrenMixin, StepParentMixin,
+                     StudentViewUserStateMixin,
                      StudentViewUserStateResultsTransformerMixin,
                      TranslationContentMixin,
-                     XBlockWithTranslationServiceMixin, _normalize_id)
+                     XBlockWithTranslationServiceMixin, _normalize_id,
+                     _number_ids, compact_result)
 from .step_review import ReviewStepBlock
+from .sub_api import batched_submissions
 from .utils import I18NService
 
 try:
@@ -223,6 +226,12 @@ class BaseMentoringBlock(
         """ Maximum score. We scale all scores to a maximum of 1.0 so this is always 1.0 """
         return 1.0
 
+    def invalidate_score(self):
+        """
+        Forget the cached `score`, after the student results it is computed from have changed.
+        """
+        lazy.invalidate(self, 'score')
+
 
 class MentoringBlock(
     StudentViewUserStateResultsTransformerMixin, I18NService,
@@ -383,15 +392,25 @@ class MentoringBlock(
             AnswerRecapBlock, MentoringTableBlock, PlotBlock, SliderBlock
         ] + additional_blocks + message_block_shims
 
+    @lazy
+    def question_numbers(self):
+        """
+        Get a dict mapping the name of each question to its step number.
+        """
+        question_numbers = {}
+        for step_id, question in zip(self.step_ids, self.steps):
+            if question is not None:
+                question_numbers.setdefault(question.name, self.step_numbers[step_id])
+        return question_numbers
+
     def get_question_number(self, question_id):
         """
         Get the step number of the question id
         """
-        for child_id in self.children:
-            question = self.runtime.get_block(child_id)
-            if isinstance(question, QuestionMixin) and (question.name == question_id):
-                return question.step_number
-        raise ValueError("Question ID in answer set not a step of this Mentoring Block!")
+        try:
+            return self.question_numbers[question_id]
+        except KeyError as err:
+            raise ValueError("Question ID in answer set not a step of this Mentoring Block!") from err
 
     def answer_mapper(self, answer_status):
         """
@@ -410,9 +429,13 @@ class MentoringBlock(
                     pass  # The question has been deleted since the student answered it.
         return answer_map
 
-    @property
+    @lazy
     def score(self):
-        """Compute the student score taking into account the weight of each step."""
+        """
+        Compute the student score taking into account the weight of each step.
+
+        The score is cached; `invalidate_score` must be called whenever `student_results` changes.
+        """
         steps = self.steps
         steps_map = {q.name: q for q in steps}
         total_child_weight = sum(float(step.weight) for step in steps)
@@ -444,6 +467,9 @@ class MentoringBlock(
         # Migrate stored data if necessary
         self.migrate_fields()
 
+        # Load the answers of all children at once, rather than while rendering each of them
+        self.prefetch_answers()
+
         # Validate self.step:
         num_steps = len(self.steps)
         self.step = min(num_steps, self.step)
@@ -454,7 +480,7 @@ class MentoringBlock(
         mcq_hide_previous_answer = self.get_option('pb_mcq_hide_previous_answer')
 
         for child_id in self.children:
-            child = self.runtime.get_block(child_id)
+            child = self.get_child_block(child_id)
             if child is None:  # child should not be None but it can happen due to bugs or permission issues
                 child_content += f'<p>[{self._("Error: Unable to load child component.")}]</p>'
             elif not isinstance(child, MentoringMessageBlock):
@@ -510,6 +536,9 @@ class MentoringBlock(
             for result in self.student_results:
                 result[1]['status'] = 'correct' if result[1]['completed'] else 'incorrect'
                 del result[1]['completed']
+            self.invalidate_score()
+        # Results used to be stored along with their tips, messages and weights
+        self.compact_student_results()
 
     @property
     def additional_publish_event_data(self):
@@ -619,13 +648,14 @@ class MentoringBlock(
         submit_results = []
         previously_completed = self.completed
         completed = True
-        for child in self.steps:
-            if child.name and child.name in submissions:
-                submission = submissions[child.name]
-                child_result = child.submit(submission)
-                submit_results.append([child.name, child_result])
-                child.save()
-                completed = completed and (child_result['status'] == 'correct')
+        with batched_submissions(self.steps):
+            for child in self.steps:
+                if child.name and child.name in submissions:
+                    submission = submissions[child.name]
+                    child_result = child.submit(submission)
+                    submit_results.append([child.name, child_result])
+                    child.save()
+                    completed = completed and (child_result['status'] == 'correct')
 
         if completed and self.next_step == self.url_name:
             self.next_step = self.followed_by
@@ -635,8 +665,9 @@ class MentoringBlock(
             # Update the results
             while self.student_results:
                 self.student_results.pop()
-            for result in submit_results:
-                self.student_results.append(result)
+            for name, result in submit_results:
+                self.student_results.append([name, compact_result(result)])
+            self.invalidate_score()
 
             # Save the user's latest score
             self.runtime.publish(self, 'grade', {
@@ -700,6 +731,7 @@ class MentoringBlock(
 
         while self.student_results:
             self.student_results.pop()
+        self.invalidate_score()
 
         return {
             'result': 'success'
@@ -766,7 +798,7 @@ class MentoringBlock(
         """
         components = []
         for child_id in self.children:
-            block = self.runtime.get_block(child_id)
+            block = self.get_child_block(child_id)
             if hasattr(block, 'student_view_data'):
                 components.append(block.student_view_data())
 
@@ -789,7 +821,7 @@ class MentoringBlock(
 
 
 class MentoringWithExplicitStepsBlock(BaseMentoringBlock, StudioContainerWithNestedXBlocksMixin,
-                                      I18NService):
+                                      PrefetchChildrenMixin, I18NService):
     """
     An XBlock providing mentoring capabilities with explicit steps
     """
@@ -832,14 +864,14 @@ class MentoringWithExplicitStepsBlock(BaseMentoringBlock, StudioContainerWithNes
         """
         Get the usage_ids of all of this XBlock's children that are "Questions".
         """
-        return list(chain.from_iterable(self.runtime.get_block(step_id).step_ids for step_id in self.step_ids))
+        return list(chain.from_iterable(self.get_child_block(step_id).step_ids for step_id in self.step_ids))
 
     @lazy
     def questions(self):
         """
         Get all questions associated with this block.
         """
-        return [self.runtime.get_block(question_id) for question_id in self.question_ids]
+        return [self.get_child_block(question_id) for question_id in self.question_ids]
 
     @property
     def active_step_safe(self):
@@ -857,7 +889,7 @@ class MentoringWithExplicitStepsBlock(BaseMentoringBlock, StudioContainerWithNes
 
     def get_active_step(self):
         """ Get the active step as an instantiated XBlock """
-        block = self.runtime.get_block(self.step_ids[self.active_step_safe])
+        block = self.get_child_block(self.step_ids[self.active_step_safe])
         if block is None:
             log.error("Unable to load step builder step child %s", self.step_ids[self.active_step_safe])
         return block
@@ -879,11 +911,27 @@ class MentoringWithExplicitStepsBlock(BaseMentoringBlock, StudioContainerWithNes
         """
         Get the step children of this block.
         """
-        return [self.runtime.get_block(step_id) for step_id in self.step_ids]
+        return [self.get_child_block(step_id) for step_id in self.step_ids]
+
+    @lazy
+    def step_numbers(self):
+        """
+        Get a dict mapping the normalized ID of each step to its (1-based) step number.
+        """
+        return _number_ids(self.step_ids)
+
+    @lazy
+    def question_numbers(self):
+        """
+        Get a dict mapping the name of each question, across all steps, to its (1-based) number.
+        """
+        return _number_ids(question.name for question in self.questions)
 
     def get_question_number(self, question_name):
-        question_names = [q.name for q in self.questions]
-        return question_names.index(question_name) + 1
+        try:
+            return self.question_numbers[question_name]
+        except KeyError as err:
+            raise ValueError("Question ID in answer set not a question of this Mentoring Block!") from err
 
     def answer_mapper(self, answer_status):
         steps = self.steps
@@ -911,10 +959,15 @@ class MentoringWithExplicitStepsBlock(BaseMentoringBlock, StudioContainerWithNes
         """ Get the Review Step XBlock child, if any. Otherwise returns None """
         for step_id in self.children:
             if child_isinstance(self, step_id, ReviewStepBlock):
-                return self.runtime.get_block(step_id)
+                return self.get_child_block(step_id)
 
-    @property
+    @lazy
     def score(self):
+        """
+        Compute the student score from the results of all steps, taking into account the weight of each question.
+
+        The score is cached; `invalidate_score` must be called whenever the results of a step change.
+        """
         questions = self.questions
         total_child_weight = sum(float(question.weight) for question in questions)
         if total_child_weight == 0:
@@ -974,11 +1027,14 @@ class MentoringWithExplicitStepsBlock(BaseMentoringBlock, StudioContainerWithNes
         fragment = Fragment()
         children_contents = []
 
+        # Load the answers of all steps and their children at once, rather than while rendering each of them
+        self.prefetch_answers()
+
         context = context or {}
         context['hide_prev_answer'] = True  # For Step Builder, we don't show the users' old answers when they try again
         context['score_summary'] = self.get_score_summary()
         for child_id in self.children:
-            child = self.runtime.get_block(child_id)
+            child = self.get_child_block(child_id)
             if child is None:  # child should not be None but it can happen due to bugs or permission issues
                 child_content = f'<p>[{self._("Error: Unable to load child component.")}]</p>'
             else:
@@ -1036,6 +1092,7 @@ class MentoringWithExplicitStepsBlock(BaseMentoringBlock, StudioContainerWithNes
         if not step_block:
             raise JsonHandlerError(500, "Unable to load the current step block.")
         response_data = step_block.submit(data)
+        self.invalidate_score()
 
         # Update the active step:
         new_value = self.active_step_safe + 1
@@ -1091,10 +1148,11 @@ class MentoringWithExplicitStepsBlock(BaseMentoringBlock, StudioContainerWithNes
     def try_again(self, data, suffix=''):
         self.active_step = 0
 
-        step_blocks = [self.runtime.get_block(child_id) for child_id in self.step_ids]
+        step_blocks = [self.get_child_block(child_id) for child_id in self.step_ids]
 
         for step in step_blocks:
             step.reset()
+        self.invalidate_score()
 
         return {
             'active_step': self.active_step
@@ -1123,7 +1181,7 @@ class MentoringWithExplicitStepsBlock(BaseMentoringBlock, StudioContainerWithNes
         components = []
 
         for child_id in self.children:
-            child = self.runtime.get_block(child_id)
+            child = self.get_child_block(child_id)
             if hasattr(child, 'student_view_data'):
                 components.append(child.student_view_data(context))
 
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problem_builder', '0007_lengthen_student_id_field'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerAggregate',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course_key', models.CharField(max_length=255)),
+                ('item_id', models.CharField(max_length=255)),
+                ('item_type', models.CharField(max_length=100)),
+                ('num_answers', models.IntegerField(default=0)),
+                ('total', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('course_key', 'item_id', 'item_type')},
+            },
+        ),
+    ]
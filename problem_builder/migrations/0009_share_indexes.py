@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problem_builder', '0008_answeraggregate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='share',
+            index=models.Index(fields=['shared_with', 'block_id', 'notified'], name='pb_share_with_block_notified'),
+        ),
+        migrations.AddIndex(
+            model_name='share',
+            index=models.Index(fields=['shared_by', 'block_id'], name='pb_share_by_block'),
+        ),
+    ]
@@ -46,6 +46,28 @@ def _normalize_id(key):
     return key
 
 
+def _number_ids(ids):
+    """
+    Helper method to map each ID to its (1-based) position in `ids`; the first occurrence wins.
+    """
+    numbers = {}
+    for number, item_id in enumerate(ids, start=1):
+        numbers.setdefault(item_id, number)
+    return numbers
+
+
+# The keys of question results that are kept in `student_results`. Tips, messages and weights are rebuilt from the
+# content of the questions whenever results are shown, so storing them only makes the user state bigger.
+STUDENT_RESULT_KEYS = ('status', 'score', 'submission', 'submissions')
+
+
+def compact_result(result):
+    """
+    Helper method to get the part of a question's result that is kept in `student_results`.
+    """
+    return {key: result[key] for key in STUDENT_RESULT_KEYS if key in result}
+
+
 class XBlockWithTranslationServiceMixin:
     """
     Mixin providing access to i18n service
@@ -72,13 +94,25 @@ class EnumerableChildMixin(XBlockWithTranslationServiceMixin):
         # parent's children.
         raise NotImplementedError("Should be overridden in child class")
 
+    @lazy
+    def sibling_numbers(self):
+        """
+        Get a dict mapping the normalized ID of each sibling to its (1-based) number.
+
+        Children of a StepParentMixin share the index built by their parent.
+        """
+        return _number_ids(self.siblings)
+
     @lazy
     def step_number(self):
-        return list(self.siblings).index(_normalize_id(self.scope_ids.usage_id)) + 1
+        try:
+            return self.sibling_numbers[_normalize_id(self.scope_ids.usage_id)]
+        except KeyError as err:
+            raise ValueError(f"{self.CAPTION} is not a child of its parent") from err
 
     @lazy
     def lonely_child(self):
-        if _normalize_id(self.scope_ids.usage_id) not in self.siblings:
+        if _normalize_id(self.scope_ids.usage_id) not in self.sibling_numbers:
             message = "{child_caption}'s parent should contain {child_caption}".format(child_caption=self.CAPTION)
             raise ValueError(message, self, self.siblings)
         return len(self.siblings) == 1
@@ -95,7 +129,59 @@ class EnumerableChildMixin(XBlockWithTranslationServiceMixin):
         return self._(self.CAPTION)
 
 
-class StepParentMixin:
+class PrefetchChildrenMixin:
+    """
+    An XBlock mixin for a parent block that loads each of its descendants, and their user state, once per request.
+
+    XBlock instances cache the field values they have read, and only live for the duration of a request,
+    so sharing the loaded child blocks means that the user state of each of them is read at most once.
+    """
+
+    @lazy
+    def loaded_blocks(self):
+        """
+        The descendants of this block loaded so far, keyed by their normalized usage ID.
+
+        This is shared with the children that use this mixin too (e.g. steps), when they are loaded.
+        """
+        return {}
+
+    def get_child_block(self, child_id):
+        """
+        Get the block for `child_id`, which may be any descendant of this block, loading it if it hasn't been yet.
+        """
+        key = _normalize_id(child_id)
+        try:
+            return self.loaded_blocks[key]
+        except KeyError:
+            pass
+        child = self.loaded_blocks[key] = self.runtime.get_block(child_id)
+        if isinstance(child, PrefetchChildrenMixin):
+            child.loaded_blocks = self.loaded_blocks
+        return child
+
+    def prefetch_answers(self):
+        """
+        Load the answers of all long answer descendants at once, before rendering them.
+
+        These answers are stored in the Answer model rather than in the user state of the blocks,
+        so they would otherwise be loaded with separate queries for each block. This loads the
+        children of this block, and the descendants of those that use this mixin too (e.g. steps),
+        so only call it from views that render all of them anyway.
+        """
+        from problem_builder.answer import \
+            prefetch_answers  # Import here to avoid circular dependency
+        blocks = []
+        pending = list(self.children)
+        while pending:
+            child = self.get_child_block(pending.pop(0))
+            blocks.append(child)
+            if isinstance(child, PrefetchChildrenMixin):
+                pending.extend(child.children)
+        prefetch_answers(blocks)
+
+
+class StepParentMixin(PrefetchChildrenMixin):
     """
     An XBlock mixin for a parent block containing Step children
     """
@@ -112,7 +198,14 @@ class StepParentMixin:
     @lazy
     def steps(self):
         """ Get the step children of this block, cached if possible. """
-        return [self.runtime.get_block(child_id) for child_id in self.step_ids]
+        return [self.get_child_block(child_id) for child_id in self.step_ids]
+
+    @lazy
+    def step_numbers(self):
+        """
+        Get a dict mapping the normalized ID of each step to its (1-based) step number.
+        """
+        return _number_ids(self.step_ids)
 
 
 class MessageParentMixin:
@@ -172,6 +265,10 @@ class QuestionMixin(EnumerableChildMixin):
     def siblings(self):
         return self.get_parent().step_ids
 
+    @lazy
+    def sibling_numbers(self):
+        return self.get_parent().step_numbers
+
     def author_view(self, context):
         context = context.copy() if context else {}
         context['hide_header'] = True
@@ -272,6 +369,13 @@ class StudentViewUserStateResultsTransformerMixin:
 
         return student_results
 
+    def compact_student_results(self):
+        """
+        Migrate `student_results` stored before results were compacted, dropping their tips, messages and weights.
+        """
+        if any(set(details) - set(STUDENT_RESULT_KEYS) for _name, details in self.student_results):
+            self.student_results = [[name, compact_result(details)] for name, details in self.student_results]
+
     def delete_key(self, dictionary, key):
         """
         Safely delete `key` from `dictionary`.
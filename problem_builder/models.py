@@ -20,11 +20,16 @@
 # Imports ###########################################################
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import connections, models, router
 from django.db.models.signals import pre_delete
 
 from .platform_dependencies import AnonymousUserId
 
+try:
+    from submissions.models import score_reset
+except ImportError:
+    score_reset = None  # We are probably in the workbench, without the submissions API
+
 # Classes ###########################################################
 
 
@@ -56,6 +61,26 @@ class Answer(models.Model):
         self.full_clean()
         super().save(*args, **kwargs)
 
+    @classmethod
+    def save_student_input(cls, student_id, course_key, name, student_input):
+        """
+        Create or update the answer with a single INSERT ... ON CONFLICT (upsert) query.
+        """
+        answer = cls(student_id=student_id, course_key=course_key, name=name, student_input=student_input)
+        # Force validation of max_length; uniqueness is handled by the upsert
+        answer.full_clean(validate_unique=False)
+        unique_fields = None
+        if connections[router.db_for_write(cls)].features.supports_update_conflicts_with_target:
+            # e.g. PostgreSQL and SQLite need to know which constraint triggers the update. MySQL doesn't support
+            # this, and updates the row matching any unique key (here, the unique_together one) instead.
+            unique_fields = ['student_id', 'course_key', 'name']
+        cls.objects.bulk_create(
+            [answer],
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=['student_input', 'modified_on'],
+        )
+
 
 class Share(models.Model):
     """
@@ -74,6 +99,63 @@ class Share(models.Model):
         # specify the app_label here.
         app_label = 'problem_builder'
         unique_together = (('shared_by', 'shared_with', 'block_id'),)
+        indexes = [
+            # For MentoringTableBlock's lookups of what has been shared with, and by, the current user:
+            models.Index(fields=['shared_with', 'block_id', 'notified'], name='pb_share_with_block_notified'),
+            models.Index(fields=['shared_by', 'block_id'], name='pb_share_by_block'),
+        ]
+
+
+class AnswerAggregate(models.Model):
+    """
+    The number and sum of the latest numeric answers of all students to a question, kept up
+    to date as answers are submitted so that average answers don't need to be recomputed from
+    every submission.
+
+    Run the `rebuild_answer_aggregates` management command to (re)compute these from the
+    submissions API, to start aggregating the answers to a course's questions or after the
+    choices of a question have been edited. Resetting the submissions of a student deletes
+    the aggregate of the question, since their latest answer is no longer counted.
+    """
+    course_key = models.CharField(max_length=255)
+    item_id = models.CharField(max_length=255)
+    item_type = models.CharField(max_length=100)
+    num_answers = models.IntegerField(default=0)
+    total = models.BigIntegerField(default=0)
+
+    class Meta:
+        # Since problem_builder isn't added to INSTALLED_APPS until it's imported,
+        # specify the app_label here.
+        app_label = 'problem_builder'
+        unique_together = (('course_key', 'item_id', 'item_type'),)
+
+    @classmethod
+    def record_answer(cls, student_item, value, previous_value=None):
+        """
+        Update the aggregate for `student_item` when a student changes their answer from
+        `previous_value` to `value`. Either value may be None if it is not a numeric answer.
+
+        Returns False if there is no aggregate to update yet.
+        """
+        num_answers = (value is not None) - (previous_value is not None)
+        total = (value or 0) - (previous_value or 0)
+        if not num_answers and not total:
+            return True
+        return bool(cls.objects.filter(
+            course_key=student_item['course_id'],
+            item_id=student_item['item_id'],
+            item_type=student_item['item_type'],
+        ).update(
+            num_answers=models.F('num_answers') + num_answers,
+            total=models.F('total') + total,
+        ))
+
+    @property
+    def average(self):
+        """ The average answer, or None if there are no answers """
+        if self.num_answers:
+            return self.total / float(self.num_answers)
+        return None
 
 
 # Signals ###########################################################
@@ -86,5 +168,15 @@ def delete_anonymous_user_answers(sender, **kwargs):
     Answer.objects.filter(student_id=instance.anonymous_user_id).delete()
 
 
+def delete_reset_answer_aggregate(sender, **kwargs):
+    """
+    Delete the AnswerAggregate of a question when the submissions of a student to it are reset.
+    """
+    AnswerAggregate.objects.filter(course_key=kwargs['course_id'], item_id=kwargs['item_id']).delete()
+
+
 if AnonymousUserId:
     pre_delete.connect(delete_anonymous_user_answers, sender=AnonymousUserId)
+
+if score_reset:
+    score_reset.connect(delete_reset_answer_aggregate)
@@ -23,7 +23,6 @@ import logging
 
 from xblock.fields import Boolean, List, Scope, String
 from xblock.validation import ValidationMessage
-from xblockutils.resources import ResourceLoader
 
 from problem_builder.mixins import (ExpandStaticURLMixin,
                                     StudentViewUserStateMixin)
@@ -114,20 +113,24 @@ class MRQBlock(SubmittingXBlockMixin, StudentViewUserStateMixin, QuestionnaireAb
         result = self.calculate_results(submissions)
         self.student_choices = submissions
 
+        if sub_api:
+            # Send the answer as a concatenated list to the submissions API
+            answer = [choice['content'] for choice in result['choices'] if choice['selected']]
+            self.create_submission(', '.join(answer))
+
         log.debug('MRQ submissions result: %s', result)
         return result
 
     def calculate_results(self, submissions):
+        """
+        Evaluate the selected choices. Nothing is saved here, that is done by submit().
+        """
         score = 0
         results = []
-        tips = None
-
-        if not self.hide_results:
-            tips = self.get_tips()
+        tip_groups = []
 
         for choice in self.custom_choices:
             choice_completed = True
-            choice_tips_html = []
             choice_selected = choice.value in submissions
 
             if choice.value in self.required_choices:
@@ -146,27 +149,17 @@ class MRQBlock(SubmittingXBlockMixin, StudentViewUserStateMixin, QuestionnaireAb
             }
             # Only include tips/results in returned response if we want to display them
             if not self.hide_results:
-                # choice_tips_html list is being set only when 'self.hide_results' is False, to optimize,
-                # execute the loop only when 'self.hide_results' is set to False
-                for tip in tips:
-                    if choice.value in tip.values:
-                        choice_tips_html.append(tip.render('mentoring_view').content)
-                        break
-
-                loader = ResourceLoader(__name__)
+                # Only the first tip for each choice is shown.
+                tip_groups.append(self.tips_by_value.get(choice.value, [])[:1])
                 choice_result['completed'] = choice_completed
-                choice_result['tips'] = loader.render_django_template('templates/html/tip_choice_group.html', {
-                    'tips_html': choice_tips_html,
-                })
 
             results.append(choice_result)
 
-        status = 'incorrect' if score <= 0 else 'correct' if score >= len(results) else 'partial'
+        if not self.hide_results:
+            for choice_result, tips_html in zip(results, self.render_tip_groups(tip_groups)):
+                choice_result['tips'] = tips_html
 
-        if sub_api:
-            # Send the answer as a concatenated list to the submissions API
-            answer = [choice['content'] for choice in results if choice['selected']]
-            sub_api.create_submission(self.student_item_key, ', '.join(answer))
+        status = 'incorrect' if score <= 0 else 'correct' if score >= len(results) else 'partial'
 
         return {
             'submissions': submissions,
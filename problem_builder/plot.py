@@ -17,9 +17,13 @@
 # "AGPLv3".  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import hashlib
 import json
 import logging
+import time
+from collections import Counter
 
+from django.core.cache import cache
 from lazy.lazy import lazy
 from web_fragments.fragment import Fragment
 from xblock.core import XBlock
@@ -27,17 +31,36 @@ from xblock.fields import Scope, String
 from xblock.validation import ValidationMessage
 from xblockutils.helpers import child_isinstance
 from xblockutils.resources import ResourceLoader
+from xblockutils.settings import XBlockWithSettingsMixin
 from xblockutils.studio_editable import (StudioContainerWithNestedXBlocksMixin,
                                          StudioEditableXBlockMixin,
                                          XBlockWithPreviewMixin)
 
 from .mixins import StudentViewUserStateMixin
-from .sub_api import sub_api
+from .models import AnswerAggregate
+from .sub_api import get_latest_answers, sub_api
 
 loader = ResourceLoader(__name__)
 
 log = logging.getLogger(__name__)
 
+# How long (in seconds) course-wide average responses are cached before being recomputed, unless overridden by
+# the "plot_average_cache_timeout" XBlock setting. A timeout of 0 disables caching.
+AVERAGE_CACHE_TIMEOUT = 300
+# How long after its timeout a cached average may still be served while it is being recomputed
+AVERAGE_CACHE_MAX_STALENESS = 300
+# How long other requests wait for one request to recompute a stale average before recomputing it themselves
+AVERAGE_CACHE_REFRESH_TIMEOUT = 60
+# How many times, and how often (in seconds), requests check whether another request has computed an average
+# that wasn't cached at all, before computing it themselves
+AVERAGE_CACHE_WAIT_CHECKS = 20
+AVERAGE_CACHE_WAIT_INTERVAL = 0.25
+
+# Cache keys of the numbers of hits, misses and stale hits of the average response cache, counted across processes
+AVERAGE_CACHE_STATS_KEYS = {
+    event: f'problem_builder.plot.average_cache_stats.{event}' for event in ('hits', 'misses', 'stale_hits')
+}
+
 
 # Make '_' a no-op so we can scrape strings
 def _(text):
@@ -56,11 +79,74 @@ def _normalize_id(key):
     return key
 
 
+def _count_average_cache_event(event):
+    """
+    Count a hit, miss or stale hit of the average response cache, in the cache shared by all processes.
+    """
+    stats_key = AVERAGE_CACHE_STATS_KEYS[event]
+    try:
+        cache.incr(stats_key)
+    except ValueError:
+        # The first event, or the counter was evicted
+        if not cache.add(stats_key, 1, None):
+            cache.incr(stats_key)  # Another process added it first
+
+
+def get_average_cache_stats():
+    """
+    Get the numbers of hits, misses and stale hits of the average response cache so far.
+    """
+    counts = cache.get_many(AVERAGE_CACHE_STATS_KEYS.values())
+    return {event: counts.get(stats_key, 0) for event, stats_key in AVERAGE_CACHE_STATS_KEYS.items()}
+
+
+def _get_cached_average(key, timeout, compute):
+    """
+    Get the average response cached under `key`, calling `compute()` to (re)compute it if it is missing or
+    older than `timeout` seconds.
+
+    Only one request at a time (re)computes a value. While it recomputes an expired value, concurrent requests
+    keep getting the stale value; while it computes a missing one, they wait for it for a while.
+    """
+    cached = cache.get(key)
+    now = time.time()
+    refresh_key = key + ':refresh'
+    if cached is not None:
+        value, expires_at = cached
+        if now < expires_at:
+            _count_average_cache_event('hits')
+            return value
+        if not cache.add(refresh_key, True, AVERAGE_CACHE_REFRESH_TIMEOUT):
+            _count_average_cache_event('stale_hits')
+            return value  # Another request is already recomputing it
+        refreshing = True
+    else:
+        refreshing = cache.add(refresh_key, True, AVERAGE_CACHE_REFRESH_TIMEOUT)
+        if not refreshing:
+            # Another request is already computing it
+            for _check in range(AVERAGE_CACHE_WAIT_CHECKS):
+                time.sleep(AVERAGE_CACHE_WAIT_INTERVAL)
+                cached = cache.get(key)
+                if cached is not None:
+                    _count_average_cache_event('hits')
+                    return cached[0]
+    _count_average_cache_event('misses')
+    log.info("Computing the average response %s. Average response cache stats: %s", key, get_average_cache_stats())
+    try:
+        value = compute()
+        cache.set(key, (value, now + timeout), timeout + AVERAGE_CACHE_MAX_STALENESS)
+    finally:
+        if refreshing:
+            cache.delete(refresh_key)
+    return value
+
+
 @XBlock.needs('i18n')
 @XBlock.wants('user')
+@XBlock.wants('settings')
 class PlotBlock(
     StudioEditableXBlockMixin, StudioContainerWithNestedXBlocksMixin, XBlockWithPreviewMixin, XBlock,
-    StudentViewUserStateMixin,
+    StudentViewUserStateMixin, XBlockWithSettingsMixin,
 ):
     """
     XBlock that displays plot that summarizes answers to scale and/or rating questions.
@@ -68,6 +154,7 @@ class PlotBlock(
 
     CATEGORY = 'sb-plot'
     STUDIO_LABEL = _("Plot")
+    block_settings_key = 'mentoring'
 
     # Settings
     display_name = String(
@@ -162,79 +249,117 @@ class PlotBlock(
 
     @property
     def default_claims(self):
-        return self._get_claims(self._get_default_response)
+        return self._get_claims('default')
 
     @property
     def average_claims(self):
-        return self._get_claims(self._get_average_response)
+        return self._get_claims('average')
 
-    def _get_claims(self, response_function):
+    def _get_claims(self, response_type):
+        responses = {url_name: response[response_type] for url_name, response in self.claim_responses.items()}
+        return [[claim, responses.get(q1), responses.get(q2)] for claim, q1, q2 in self.parsed_claims]
+
+    @lazy
+    def parsed_claims(self):
+        """
+        Get the claims as a list of [claim, q1, q2] lists, where q1 and q2 are question url_names.
+        """
         if not self.claims:
             return []
 
-        mentoring_block = self.get_parent().get_parent()
-        question_ids, questions = mentoring_block.question_ids, mentoring_block.questions
         claims = []
         for line in self.claims.split('\n'):
             claim, q1, q2 = line.split(', ')
-            r1, r2 = None, None
-            for question_id, question in zip(question_ids, questions):
-                if question.url_name == q1:
-                    r1 = response_function(question, question_id)
-                if question.url_name == q2:
-                    r2 = response_function(question, question_id)
-                if r1 is not None and r2 is not None:
-                    break
-            claims.append([claim, r1, r2])
-
+            claims.append([claim, q1, q2])
         return claims
 
-    def _get_default_response(self, question, question_id):
-        # 1. Obtain block_type for question
-        question_type = question.scope_ids.block_type
-        # 2. Obtain latest submission for question
-        student_dict = {
-            'student_id': self.runtime.anonymous_student_id,
-            'course_id': self.course_key_str,
-            'item_id': question_id,
-            'item_type': question_type,
-        }
-        submissions = sub_api.get_submissions(student_dict, limit=1)
-        # 3. Extract response from latest submission for question
-        answer_cache = {}
-        for submission in submissions:
-            answer = self._get_answer(question, submission, answer_cache)
-            return int(answer)
+    @lazy
+    def claim_questions(self):
+        """
+        Get a dict mapping the url_name of each question used by the claims to its (usage ID, block).
+        """
+        if not self.parsed_claims:
+            return {}
+
+        url_names = {url_name for _claim, q1, q2 in self.parsed_claims for url_name in (q1, q2)}
+        mentoring_block = self.get_parent().get_parent()
+        claim_questions = {}
+        for question_id, question in zip(mentoring_block.question_ids, mentoring_block.questions):
+            if question.url_name in url_names:
+                claim_questions.setdefault(question.url_name, (question_id, question))
+        return claim_questions
+
+    @lazy
+    def claim_responses(self):
+        """
+        Get a dict mapping the url_name of each question used by the claims to the student's latest
+        ('default') and the course-wide 'average' response to it.
+
+        The student's latest answers to all of the questions are loaded with one query.
+        """
+        questions = list(self.claim_questions.items())
+        student_items = [
+            {
+                'student_id': self.runtime.anonymous_student_id,
+                'course_id': self.course_key_str,
+                'item_id': str(question_id),
+                'item_type': question.scope_ids.block_type,
+            }
+            for _url_name, (question_id, question) in questions
+        ]
+        latest_answers = get_latest_answers(student_items) if student_items else []
+        claim_responses = {}
+        for (url_name, (question_id, question)), answer in zip(questions, latest_answers):
+            claim_responses[url_name] = {
+                'default': None if answer is None else int(question.get_submission_display(answer)),
+                'average': self._get_average_response(question, question_id),
+            }
+        return claim_responses
+
+    @lazy
+    def average_cache_timeout(self):
+        """
+        How long (in seconds) to cache the course-wide average responses for.
+        """
+        xblock_settings = self.get_xblock_settings(default={})
+        if xblock_settings and 'plot_average_cache_timeout' in xblock_settings:
+            return xblock_settings['plot_average_cache_timeout']
+        return AVERAGE_CACHE_TIMEOUT
 
     def _get_average_response(self, question, question_id):
+        """
+        Get the average response of all students to `question`, from the cache if it is recent enough.
+        """
+        timeout = self.average_cache_timeout
+        if not timeout:
+            return self._compute_average_response(question, question_id)
+        key_parts = (self.course_key_str, question.scope_ids.block_type, str(question_id))
+        key = 'problem_builder.plot.average.' + hashlib.md5(repr(key_parts).encode('utf-8')).hexdigest()
+        return _get_cached_average(key, timeout, lambda: self._compute_average_response(question, question_id))
+
+    def _compute_average_response(self, question, question_id):
         # 1. Obtain block_type for question
         question_type = question.scope_ids.block_type
-        # 2. Obtain latest submissions for question
+        # 2. Look up the maintained aggregate of the latest submissions for question
+        try:
+            aggregate = AnswerAggregate.objects.get(
+                course_key=self.course_key_str, item_id=str(question_id), item_type=question_type
+            )
+        except AnswerAggregate.DoesNotExist:
+            pass  # Not aggregated yet (see the rebuild_answer_aggregates command): compute it from the submissions
+        else:
+            return aggregate.average
+        # 3. Obtain latest submissions for question
         submissions = sub_api.get_all_submissions(self.course_key_str, question_id, question_type)
-        # 3. Extract responses from latest submissions for question and sum them up
-        answer_cache = {}
-        response_total = 0
-        num_submissions = 0  # Can't use len(submissions) because submissions is a generator
-        for submission in submissions:
-            answer = self._get_answer(question, submission, answer_cache)
-            response_total += int(answer)
-            num_submissions += 1
-        # 4. Calculate average response for question
+        # 4. Count each distinct answer, convert them to responses and sum them up
+        answer_counts = Counter(submission['answer'] for submission in submissions)
+        responses = question.get_submission_displays(list(answer_counts))
+        response_total = sum(int(response) * count for response, count in zip(responses, answer_counts.values()))
+        num_submissions = sum(answer_counts.values())
+        # 5. Calculate average response for question
         if num_submissions:
             return response_total / float(num_submissions)
 
-    def _get_answer(self, block, submission, answer_cache):
-        """
-        Return answer associated with `submission` to `block`.
-
-        `answer_cache` is a dict that is reset for each block.
-        """
-        answer = submission['answer']
-        # Convert from answer ID to answer label
-        if answer not in answer_cache:
-            answer_cache[answer] = block.get_submission_display(answer)
-        return answer_cache[answer]
-
     def default_claims_json(self):
         return json.dumps(self.default_claims)
 
@@ -291,13 +416,11 @@ class PlotBlock(
             return []
 
         overlay_data = []
-        claims = self.claims.split('\n')
         for index, overlay in enumerate(self.overlays):
             claims_json = []
             if overlay.claim_data:
                 claim_data = overlay.claim_data.split('\n')
-                for claim, data in zip(claims, claim_data):
-                    claim = claim.split(', ')[0]
+                for (claim, _q1, _q2), data in zip(self.parsed_claims, claim_data):
                     r1, r2 = data.split(', ')
                     claims_json.append([claim, int(r1), int(r2)])
             claims_json = json.dumps(claims_json)
@@ -313,14 +436,7 @@ class PlotBlock(
 
     @lazy
     def claims_display(self):
-        if not self.claims:
-            return []
-
-        claims = []
-        for claim in self.claims.split('\n'):
-            claim, q1, q2 = claim.split(', ')
-            claims.append([claim, q1, q2])
-        return claims
+        return self.parsed_claims
 
     def author_preview_view(self, context):
         context['self'] = self
@@ -191,6 +191,7 @@ function InstructorToolBlock(runtime, element) {
         initialize: function() {
             this.listenTo(this, 'processing', this._showSpinner);
             this.listenTo(this, 'notify', this._displayMessage);
+            this.listenTo(this, 'progress', this._displayProgress);
             this.listenTo(this, 'stopped', this._empty);
             this.listenTo(resultsView, 'rendered', this._empty);
         },
@@ -206,6 +207,14 @@ function InstructorToolBlock(runtime, element) {
             this.$el.append($('<p>').text(message));
         },
 
+        _displayProgress: function(message) {
+            var $progress = this.$el.find('.data-export-progress');
+            if (!$progress.length) {
+                $progress = $('<p>').addClass('data-export-progress').appendTo(this.$el);
+            }
+            $progress.text(message);
+        },
+
         _empty: function() {
             this.$el.empty();
         }
@@ -229,6 +238,7 @@ function InstructorToolBlock(runtime, element) {
     var $rootBlockId = $element.find("select[name='root_block_id']");
     var $usernames = $element.find("input[name='usernames']");
     var $matchString = $element.find("input[name='match_string']");
+    var $incremental = $element.find("input[name='incremental']");
     var $resultTable = $element.find('.data-export-results');
 
     var status;
@@ -390,6 +400,10 @@ function InstructorToolBlock(runtime, element) {
         statusView.trigger('notify', message);
     }
 
+    function showProgress(message) {
+        statusView.trigger('progress', message);
+    }
+
     function handleError(data) {
         // Shim to make the XBlock JsonHandlerError response work with our format.
         status = {'last_export_result': JSON.parse(data.responseText), 'export_pending': false};
@@ -427,7 +441,12 @@ function InstructorToolBlock(runtime, element) {
                 resultsView.collection.getFirstPage();
             }
         } else {
-            if (status.export_pending) {
+            if (status.export_pending && status.export_progress) {
+                showProgress(_.template(
+                    gettext('<%= completed %> of <%= total %> parts of the report have been generated…'),
+                    status.export_progress
+                ));
+            } else if (status.export_pending) {
                 showStatusMessage(gettext('The report is currently being generated…'));
             } else {
                 hideSpinner();
@@ -443,7 +462,8 @@ function InstructorToolBlock(runtime, element) {
                     block_types: $blockTypes.val(),
                     root_block_id: $rootBlockId.val(),
                     usernames: $usernames.val(),
-                    match_string: $matchString.val()
+                    match_string: $matchString.val(),
+                    incremental: $incremental.is(':checked')
                 };
                 data = JSON.stringify(data);
             } else {
@@ -19,10 +19,12 @@
 
 # Imports ###########################################################
 
+import hashlib
 import uuid
 
 import pkg_resources
 from django import utils
+from django.core.cache import cache
 from django.utils.safestring import mark_safe
 from lazy import lazy
 from web_fragments.fragment import Fragment
@@ -45,6 +47,10 @@ from .utils import I18NService
 
 loader = ResourceLoader(__name__)
 
+# How long (in seconds) rendered tips are cached. The cache key changes whenever the content of the tips does, so
+# this only bounds how long the HTML of edited or deleted tips lingers in the cache.
+TIPS_CACHE_TIMEOUT = 24 * 60 * 60
+
 
 # Make '_' a no-op so we can scrape strings
 def _(text):
@@ -127,19 +133,49 @@ class QuestionnaireAbstractBlock(
     def mentoring_view(self, context=None):
         return self.student_view(context)
 
-    @property
-    def custom_choices(self):
-        custom_choices = []
+    @lazy
+    def _choices_and_tips(self):
+        """
+        Load the choice and tip children of this block in a single pass over its children.
+        """
+        choices, tips = [], []
         for child_id in self.children:
             if child_isinstance(self, child_id, ChoiceBlock):
-                custom_choices.append(self.runtime.get_block(child_id))
-        return custom_choices
+                choices.append(self.runtime.get_block(child_id))
+            elif child_isinstance(self, child_id, TipBlock):
+                tips.append(self.runtime.get_block(child_id))
+        return choices, tips
 
     @property
+    def custom_choices(self):
+        return self._choices_and_tips[0]
+
+    @lazy
+    def choice_labels(self):
+        """
+        A dict of the content of each custom choice, by value
+        """
+        labels = {}
+        for choice in self.custom_choices:
+            labels.setdefault(choice.value, choice.content)  # If values are duplicated, the first choice wins
+        return labels
+
+    @lazy
+    def tips_by_value(self):
+        """
+        A dict of the tips for each choice value, in the order they appear in this block
+        """
+        tips_by_value = {}
+        for tip in self.get_tips():
+            for value in tip.values:
+                tips_by_value.setdefault(value, []).append(tip)
+        return tips_by_value
+
+    @lazy
     def all_choice_values(self):
         return [c.value for c in self.custom_choices]
 
-    @property
+    @lazy
     def human_readable_choices(self):
         return [{"display_name": mark_safe(c.content), "value": c.value} for c in self.custom_choices]
 
@@ -155,20 +191,67 @@ class QuestionnaireAbstractBlock(
         """
         Returns the tips contained in this block
         """
-        tips = []
-        for child_id in self.children:
-            if child_isinstance(self, child_id, TipBlock):
-                tips.append(self.runtime.get_block(child_id))
-        return tips
+        return self._choices_and_tips[1]
+
+    @lazy
+    def _rendered_tips(self):
+        """
+        The HTML of the groups of tips rendered or read from the cache so far, keyed by their cache key
+        """
+        return {}
+
+    def render_tips(self, tips):
+        """
+        Get the HTML of the given tips as shown in the feedback for a choice.
+        """
+        return self.render_tip_groups([tips])[0]
+
+    def render_tip_groups(self, tip_groups):
+        """
+        Get the HTML of each of the given lists of tips as shown in the feedback for a choice.
+
+        The rendered HTML only depends on the content of the tips, so it is cached under a key derived from that
+        content and shared by all students. All of the groups are read from the cache at once.
+        """
+        keys = []
+        for tips in tip_groups:
+            key_parts = [(str(tip.scope_ids.usage_id), tip.content, tip.width, tip.height) for tip in tips]
+            keys.append('problem_builder.tips.' + hashlib.md5(repr(key_parts).encode('utf-8')).hexdigest())
+        missing_keys = set(keys).difference(self._rendered_tips)
+        if missing_keys:
+            self._rendered_tips.update(cache.get_many(missing_keys))
+            rendered = {}
+            for key, tips in zip(keys, tip_groups):
+                if key not in self._rendered_tips:
+                    rendered[key] = self._rendered_tips[key] = loader.render_django_template(
+                        'templates/html/tip_choice_group.html',
+                        {'tips_html': [tip.render('mentoring_view').content for tip in tips]},
+                    )
+            if rendered:
+                cache.set_many(rendered, TIPS_CACHE_TIMEOUT)
+        return [self._rendered_tips[key] for key in keys]
 
     def get_submission_display(self, submission):
         """
         Get the human-readable version of a submission value
         """
-        for choice in self.custom_choices:
-            if choice.value == submission:
-                return choice.content
-        return submission
+        return self.get_submission_displays([submission])[0]
+
+    def get_submission_displays(self, submissions):
+        """
+        Get the human-readable versions of a list of submission values.
+
+        Submissions that are lists of choice values (like the choices of an MRQ) are shown as a
+        comma-separated list of choices.
+        """
+        labels = self.choice_labels
+        displays = []
+        for submission in submissions:
+            if isinstance(submission, list):
+                displays.append(', '.join(labels.get(value, value) for value in submission))
+            else:
+                displays.append(labels.get(submission, submission))
+        return displays
 
     def get_author_edit_view_fragment(self, context):
         fragment = super().author_edit_view(context)
@@ -57,6 +57,7 @@ class SliderBlock(
     CATEGORY = 'pb-slider'
     STUDIO_LABEL = _("Ranged Value Slider")
     USER_STATE_FIELDS = ['student_value']
+    aggregate_answers = True  # PlotBlock displays the average answer
 
     answerable = True
 
@@ -171,7 +172,7 @@ class SliderBlock(
         self.student_value = value
         if sub_api:
             # Also send to the submissions API:
-            sub_api.create_submission(self.student_item_key, value)
+            self.create_submission(value)
         result = self.get_last_result()
         log.debug('Slider submission result: %s', result)
         return result
@@ -182,6 +183,12 @@ class SliderBlock(
         """
         return submission * 100
 
+    def get_submission_displays(self, submissions):
+        """
+        Get the human-readable versions of a list of submission values
+        """
+        return [submission * 100 for submission in submissions]
+
     def validate_field_data(self, validation, data):
         """
         Validate this block's field data.
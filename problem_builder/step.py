@@ -34,13 +34,14 @@ from problem_builder.completion import CompletionBlock
 from problem_builder.mcq import MCQBlock, RatingBlock
 from problem_builder.mixins import (
     EnumerableChildMixin, StepParentMixin, StudentViewUserStateMixin,
-    StudentViewUserStateResultsTransformerMixin)
+    StudentViewUserStateResultsTransformerMixin, compact_result)
 from problem_builder.mrq import MRQBlock
 from problem_builder.plot import PlotBlock
 from problem_builder.slider import SliderBlock
 from problem_builder.table import MentoringTableBlock
 
 from .mixins import TranslationContentMixin
+from .sub_api import batched_submissions
 from .utils import I18NService
 
 log = logging.getLogger(__name__)
@@ -116,6 +117,10 @@ class MentoringStepBlock(
     def siblings(self):
         return self.get_parent().step_ids
 
+    @lazy
+    def sibling_numbers(self):
+        return self.get_parent().step_numbers
+
     @property
     def is_last_step(self):
         parent = self.get_parent()
@@ -174,17 +179,18 @@ class MentoringStepBlock(
 
         # Submit child blocks (questions) and gather results
         submit_results = []
-        for child in self.steps:
-            if child.name and child.name in submissions:
-                submission = submissions[child.name]
-                child_result = child.submit(submission)
-                submit_results.append([child.name, child_result])
-                child.save()
+        with batched_submissions(self.steps):
+            for child in self.steps:
+                if child.name and child.name in submissions:
+                    submission = submissions[child.name]
+                    child_result = child.submit(submission)
+                    submit_results.append([child.name, child_result])
+                    child.save()
 
         # Update results stored for this step
         self.reset()
-        for result in submit_results:
-            self.student_results.append(result)
+        for name, result in submit_results:
+            self.student_results.append([name, compact_result(result)])
         self.save()
 
         return {
@@ -239,6 +245,8 @@ class MentoringStepBlock(
 
     def mentoring_view(self, context=None):
         """ Mentoring View """
+        # Migrate stored data if necessary
+        self.compact_student_results()
         return self._render_view(context, 'mentoring_view')
 
     def _render_view(self, context, view):
@@ -251,7 +259,7 @@ class MentoringStepBlock(
         child_contents = []
 
         for child_id in self.children:
-            child = self.runtime.get_block(child_id)
+            child = self.get_child_block(child_id)
             if child is None:  # child should not be None but it can happen due to bugs or permission issues
                 child_contents.append(f'<p>[{self._("Error: Unable to load child component.")}]</p>')
             else:
@@ -289,7 +297,7 @@ class MentoringStepBlock(
         components = []
 
         for child_id in self.children:
-            child = self.runtime.get_block(child_id)
+            child = self.get_child_block(child_id)
             if hasattr(child, 'student_view_data'):
                 components.append(child.student_view_data(context))
 
@@ -21,12 +21,87 @@ Integrations between these XBlocks and the edX Submissions API
 """
 
 
+from contextlib import contextmanager
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
 from xblock.completable import XBlockCompletionMode
 
+from .models import AnswerAggregate
+
 try:
     from submissions import api as sub_api
+    from submissions.models import Submission
 except ImportError:
     sub_api = None  # We are probably in the workbench. Don't use the submissions API
+    Submission = None
+
+
+def get_submission_queryset(read_replica=True):
+    """
+    Get a queryset of all submissions, from the read replica database if there is one, like the submissions API
+    uses for reading many submissions.
+    """
+    assert Submission is not None
+    if read_replica and 'read_replica' in settings.DATABASES:
+        return Submission.objects.using('read_replica')
+    return Submission.objects.all()
+
+
+def get_latest_answers(student_items):
+    """
+    Get the most recent answer for each of several student items, with a single query.
+
+    `student_items` are student_item_dicts, as taken by the submissions API. Returns a list with the latest
+    answer for each of them, or None where there is no submission, like calling
+    `sub_api.get_submissions(student_item, limit=1)` for each student item in turn would.
+    """
+    assert sub_api is not None
+    item_keys = [_get_item_key(student_item) for student_item in student_items]
+    if not item_keys:
+        return []
+    fields = ('student_id', 'course_id', 'item_id', 'item_type')
+    # Sort like `sub_api.get_submissions` so that the most recent submission comes first in each group.
+    submissions = get_submission_queryset().select_related('student_item').filter(**{
+        f'student_item__{field}__in': {item_key[index] for item_key in item_keys}
+        for index, field in enumerate(fields)
+    }).order_by(*[f'student_item__{field}' for field in fields], '-submitted_at', '-id')
+    latest_answers = {
+        item_key: next(group).answer
+        for item_key, group in groupby(submissions, lambda submission: _get_item_key(submission.student_item))
+    }
+    return [latest_answers.get(item_key) for item_key in item_keys]
+
+
+def _get_item_key(student_item):
+    """ Get a hashable key for a student_item_dict or StudentItem """
+    if isinstance(student_item, dict):
+        return student_item['student_id'], student_item['course_id'], student_item['item_id'], student_item['item_type']
+    return student_item.student_id, student_item.course_id, student_item.item_id, student_item.item_type
+
+
+@contextmanager
+def batched_submissions(blocks):
+    """
+    Queue the submissions that `blocks` create within this context, e.g. while a parent block
+    submits its children, and write them once it exits without errors, so that an error partway
+    doesn't leave the submissions of only some of the children behind.
+
+    The submissions API writes each submission in its own transaction: they aren't wrapped in an
+    outer one, which would keep them and their answer aggregates locked until the last is written.
+    """
+    pending_submissions = []
+    submitting_blocks = [block for block in blocks if isinstance(block, SubmittingXBlockMixin)]
+    for block in submitting_blocks:
+        block.pending_submissions = pending_submissions
+    try:
+        yield
+    finally:
+        for block in submitting_blocks:
+            block.pending_submissions = None
+    for block, student_item, answer in pending_submissions:
+        block.write_submission(student_item, answer)
 
 
 class SubmittingXBlockMixin:
@@ -36,6 +111,12 @@ class SubmittingXBlockMixin:
 
     completion_mode = XBlockCompletionMode.COMPLETABLE
     has_score = True
+    # Whether to keep an AnswerAggregate of the numeric answers of all students up to date
+    aggregate_answers = False
+    # Whether any answer to this block can be numeric, and so count in the AnswerAggregate
+    has_numeric_answers = True
+    # A list to queue submissions in instead of writing them right away; see batched_submissions()
+    pending_submissions = None
 
     @property
     def student_item_key(self):
@@ -50,3 +131,73 @@ class SubmittingXBlockMixin:
             item_id=str(location),
             item_type=self.scope_ids.block_type,
         )
+
+    def create_submission(self, answer, student_item=None):
+        """
+        Send `answer` to the submissions API, for `student_item` or else this block's student_item_key.
+
+        Within batched_submissions(), the submission is queued to be written along with the others.
+        """
+        if student_item is None:
+            student_item = self.student_item_key
+        if self.pending_submissions is not None:
+            self.pending_submissions.append((self, student_item, answer))
+        else:
+            self.write_submission(student_item, answer)
+
+    def write_submission(self, student_item, answer):
+        """
+        Write a submission to the submissions API.
+
+        If `aggregate_answers` is set, the AnswerAggregate is updated once the submission has been
+        committed, so that the shared aggregate row isn't locked for the rest of the request.
+        """
+        sub_api.create_submission(student_item, answer)
+        if self.aggregate_answers and self.has_numeric_answers:
+            transaction.on_commit(lambda: self.update_answer_aggregate(student_item))
+
+    def update_answer_aggregate(self, student_item):
+        """
+        Count the latest submission of `student_item` in its AnswerAggregate in place of the previous one.
+
+        Questions without an AnswerAggregate yet are left alone: PlotBlock computes their averages from
+        the submissions until the `rebuild_answer_aggregates` management command builds it.
+        """
+        values = [
+            self.get_aggregate_value(submission['answer'])
+            for submission in sub_api.get_submissions(student_item, limit=2)
+        ]
+        if values:
+            AnswerAggregate.record_answer(student_item, values[0], values[1] if len(values) > 1 else None)
+
+    def rebuild_answer_aggregate(self, student_item):
+        """
+        Recompute the AnswerAggregate of the question of `student_item` from the latest submission of each student.
+        """
+        course_id, item_id, item_type = student_item['course_id'], student_item['item_id'], student_item['item_type']
+        num_answers, total = 0, 0
+        values = {}
+        for submission in sub_api.get_all_submissions(course_id, item_id, item_type):
+            answer = submission['answer']
+            if answer not in values:
+                values[answer] = self.get_aggregate_value(answer)
+            if values[answer] is not None:
+                num_answers += 1
+                total += values[answer]
+        AnswerAggregate.objects.update_or_create(
+            course_key=course_id,
+            item_id=item_id,
+            item_type=item_type,
+            defaults={'num_answers': num_answers, 'total': total},
+        )
+
+    def get_aggregate_value(self, answer):
+        """
+        Get the number that `answer` adds to the AnswerAggregate, or None if it is not numeric.
+
+        This is the number that PlotBlock displays for the answer.
+        """
+        try:
+            return int(self.get_submission_display(answer))
+        except (TypeError, ValueError):
+            return None
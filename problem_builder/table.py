@@ -23,6 +23,7 @@ import errno
 import json
 
 from django.contrib.auth.models import User
+from lazy import lazy
 from web_fragments.fragment import Fragment
 from xblock.core import XBlock
 from xblock.exceptions import JsonHandlerError
@@ -109,7 +110,7 @@ class MentoringTableBlock(
         try:
             if target_username and target_username != self.current_user_key:
                 share = Share.objects.get(
-                    shared_by__username=target_username, shared_with__username=self.current_user_key,
+                    shared_by__username=target_username, shared_with_id=self.current_user_id,
                     block_id=self.block_id,
                 )
                 context['student_submissions_key'] = share.submission_uid
@@ -137,10 +138,22 @@ class MentoringTableBlock(
         # We may be in the SDK, in which case the username may not really be available.
         return user.opt_attrs.get('edx-platform.username', 'username')
 
+    @lazy
+    def current_user_id(self):
+        """
+        Get the ID of the current user, so that shares can be looked up without joining the user table.
+        """
+        user = self.runtime.service(self, 'user').get_current_user()
+        user_id = user.opt_attrs.get('edx-platform.user_id')
+        if user_id is None:
+            # We may be in the SDK, in which case the user ID is not available.
+            user_id = User.objects.filter(username=self.current_user_key).values_list('id', flat=True).first()
+        return user_id
+
     @XBlock.json_handler
     def get_shared_list(self, data, suffix=''):
         context = {'shared_with': Share.objects.filter(
-            shared_by__username=self.current_user_key,
+            shared_by_id=self.current_user_id,
             block_id=self.block_id,
         ).values_list('shared_with__username', flat=True)
         }
@@ -163,7 +176,7 @@ class MentoringTableBlock(
         except ValueError as err:
             raise JsonHandlerError(400, "Usernames must be a list.") from err
         Share.objects.filter(
-            shared_with__username=self.current_user_key,
+            shared_with_id=self.current_user_id,
             shared_by__username__in=usernames,
             block_id=self.block_id,
         ).update(
@@ -187,24 +200,25 @@ class MentoringTableBlock(
         target_usernames = [username.strip().lower() for username in target_usernames if username.strip()]
         current_user = User.objects.get(username=self.current_user_key)
 
-        failed_users = []
         if not target_usernames:
             raise JsonHandlerError(400, _('Usernames not provided.'))
-        for target_username in target_usernames:
-            try:
-                target_user = User.objects.get(username=target_username)
-            except User.DoesNotExist:
-                failed_users.append(target_username)
-                continue
-            if current_user == target_user:
-                continue
-            try:
-                Share.objects.get(shared_by=current_user, shared_with=target_user, block_id=self.block_id)
-            except Share.DoesNotExist:
-                Share(
-                    shared_by=current_user, submission_uid=self.runtime.anonymous_student_id, shared_with=target_user,
-                    block_id=self.block_id,
-                ).save()
+        # Usernames may match case-insensitively, depending on the database collation (e.g. on MySQL)
+        target_user_ids = {
+            username.lower(): user_id
+            for username, user_id in User.objects.filter(username__in=target_usernames).values_list('username', 'id')
+        }
+        failed_users = [username for username in target_usernames if username not in target_user_ids]
+        already_shared_with = set(Share.objects.filter(
+            shared_by=current_user, shared_with_id__in=target_user_ids.values(), block_id=self.block_id,
+        ).values_list('shared_with_id', flat=True))
+        new_share_user_ids = set(target_user_ids.values()) - already_shared_with - {current_user.id}
+        Share.objects.bulk_create([
+            Share(
+                shared_by=current_user, submission_uid=self.runtime.anonymous_student_id, shared_with_id=user_id,
+                block_id=self.block_id,
+            )
+            for user_id in sorted(new_share_user_ids)
+        ], ignore_conflicts=True)
 
         if failed_users:
             raise JsonHandlerError(
@@ -221,7 +235,7 @@ class MentoringTableBlock(
         if not target_username:
             raise JsonHandlerError(400, _('Username not provided.'))
         Share.objects.filter(
-            shared_by__username=self.current_user_key,
+            shared_by_id=self.current_user_id,
             shared_with__username=target_username,
             block_id=self.block_id,
         ).delete()
@@ -241,16 +255,14 @@ class MentoringTableBlock(
         context['allow_download'] = self.allow_download
         user_service = self.runtime.service(self, 'user')
         if user_service:
-            context['view_options'] = Share.objects.filter(
-                shared_with__username=self.current_user_key,
+            shares = list(Share.objects.filter(
+                shared_with_id=self.current_user_id,
                 block_id=self.block_id,
-            ).values_list('shared_by__username', flat=True)
+            ).values_list('shared_by__username', 'notified'))
+            context['view_options'] = [username for username, _notified in shares]
             context['username'] = self.current_user_key
-            share_notifications = Share.objects.filter(
-                shared_with__username=self.current_user_key,
-                notified=False, block_id=self.block_id,
-            ).values_list('shared_by__username', flat=True)
-            context['share_notifications'] = share_notifications and json.dumps(list(share_notifications))
+            share_notifications = [username for username, notified in shares if not notified]
+            context['share_notifications'] = share_notifications and json.dumps(share_notifications)
 
         if self.type:
             # Load an optional background image:
@@ -1,12 +1,23 @@
 """
 Celery task for CSV student answer export.
 """
+import csv
+import io
+import json
+import shutil
+import sys
+import tempfile
 import time
+from array import array
+from datetime import datetime, timezone
+from itertools import groupby, islice
+from uuid import uuid4
 
-from celery import shared_task
+from celery import chord, shared_task
 from celery.utils.log import get_task_logger
 from django.contrib.auth.models import User
-from django.db.models import F
+from django.core.files import File
+from django.db.models import Exists, F, OuterRef, Q
 from lms.djangoapps.instructor_task.models import ReportStore
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey, UsageKey
@@ -18,27 +29,49 @@ from problem_builder.answer import AnswerBlock
 from .mcq import MCQBlock, RatingBlock
 from .mrq import MRQBlock
 from .questionnaire import QuestionnaireAbstractBlock
-from .sub_api import sub_api
+from .sub_api import get_submission_queryset, sub_api
 
 logger = get_task_logger(__name__)
 
+# Number of rows that are built in memory before being flushed to the report file.
+# The first chunk doubles as the preview that is displayed in the Instructor Tool.
+EXPORT_CHUNK_SIZE = 1000
 
-@shared_task()
-def export_data(course_id, source_block_id_str, block_types, user_ids, match_string):
+# Maximum number of `export_shard` tasks an export is split into.
+# Each shard exports a contiguous slice of the blocks, so that merging them preserves the course order.
+EXPORT_MAX_SHARDS = 20
+
+# Suffix of the files holding the byte offset of each row of a (partial) report, and the size of each offset.
+INDEX_SUFFIX = '.idx'
+# Directory of the report store where the partial reports and the indexes are stored. `ReportStore.links_for`
+# only lists the files of the course directory itself, so they don't show up in the list of reports to download.
+EXPORT_FILES_DIR = 'pb-data-export-files'
+ROW_OFFSET_SIZE = array('Q').itemsize
+
+HEADER_ROW = ["Section", "Subsection", "Unit", "Type", "Question", "Answer", "Username", "User ID", "User E-mail"]
+
+
+@shared_task(bind=True)
+def export_data(self, course_id, source_block_id_str, block_types, user_ids, match_string, since=None):
     """
     Exports student answers to all supported questions to a CSV file.
+
+    If `since` (a POSIX timestamp) is given, only submissions made after it are exported.
+
+    The blocks to export are split into shards, which are exported in parallel by `export_shard` tasks
+    and then merged into the report by a `merge_export` task. Unless this task runs eagerly, it returns
+    the IDs of those tasks, so that the caller can follow the progress of the export and cancel it.
     """
     start_timestamp = time.time()
 
     logger.debug("Beginning data export")
     try:
-        course_key = CourseKey.from_string(course_id)
+        CourseKey.from_string(course_id)
         usage_key = UsageKey.from_string(source_block_id_str)
     except InvalidKeyError as err:
         raise ValueError("Could not find the specified Block ID.") from err
 
     src_block = modulestore().get_item(usage_key)
-    course_key_str = str(course_key)
     type_map = {cls.__name__: cls for cls in [MCQBlock, MRQBlock, RatingBlock, AnswerBlock]}
 
     if not block_types:
@@ -47,64 +80,313 @@ def export_data(course_id, source_block_id_str, block_types, user_ids, match_str
         block_types = tuple(type_map[class_name] for class_name in block_types)
 
     # Build an ordered list of blocks to include in the export
-    blocks_to_include = []
+    blocks_to_include, context_index = scan_for_blocks(src_block, block_types)
 
-    def scan_for_blocks(block):
-        """ Recursively scan the course tree for blocks of interest """
-        if isinstance(block, block_types):
-            blocks_to_include.append(block)
-        elif block.has_children:
-            for child_id in block.children:
-                try:
-                    scan_for_blocks(block.runtime.get_block(child_id))
-                except ItemNotFoundError:
-                    # Blocks may refer to missing children. Don't break in this case.
-                    pass
+    # Fan out the export of the blocks, and merge the results into the CSV:
+    timestamp = time.strftime("%Y-%m-%d-%H%M%S", time.gmtime(start_timestamp))
+    filename = f"pb-data-export-{timestamp}.csv"
+    # The ID of the merge task also identifies the files of this export, in case another one starts in the same second.
+    export_id = str(uuid4())
+    shard_tasks = []
+    for shard_index, blocks in enumerate(_split(blocks_to_include, EXPORT_MAX_SHARDS)):
+        shard_blocks = [
+            (str(block.scope_ids.usage_id), context_index[block.scope_ids.usage_id]) for block in blocks
+        ]
+        part_filename = f"{EXPORT_FILES_DIR}/{filename}.{export_id}.part{shard_index}"
+        shard_tasks.append(
+            export_shard.s(
+                course_id, part_filename, shard_blocks, user_ids, match_string, since
+            ).set(task_id=str(uuid4()))
+        )
+    merge_task = merge_export.s(course_id, filename, export_id, start_timestamp).set(task_id=export_id)
+    # If a shard or the merge fails, don't leave the partial reports behind.
+    merge_task.on_error(delete_export_parts.s(course_id, export_id))
+    merge_result = chord(shard_tasks)(merge_task)
+
+    if self.request.is_eager:
+        # The whole export already ran synchronously, so there is nothing to follow.
+        return merge_result.get()
+    return {
+        "error": None,
+        "merge_task_id": merge_result.id,
+        "shard_task_ids": [shard_task.id for shard_task in shard_tasks],
+    }
 
-    scan_for_blocks(src_block)
 
-    # Define the header row of our CSV:
-    rows = []
-    rows.append(
-        ["Section", "Subsection", "Unit", "Type", "Question", "Answer", "Username", "User ID", "User E-mail"]
-    )
+@shared_task()
+def export_shard(course_id, part_filename, shard_blocks, user_ids, match_string, since=None):
+    """
+    Exports student answers to the blocks of one shard of an export to a partial CSV file.
 
-    # Collect results for each block in blocks_to_include
-    for block in blocks_to_include:
-        if not user_ids:
-            results = _extract_data(course_key_str, block, None, match_string)
-            rows += results
-        else:
-            for user_id in user_ids:
-                results = _extract_data(course_key_str, block, user_id, match_string)
-                rows += results
-
-    # Generate the CSV:
-    timestamp = time.strftime("%Y-%m-%d-%H%M%S", time.gmtime(start_timestamp))
-    filename = f"pb-data-export-{timestamp}.csv"
+    `shard_blocks` is a list of (usage ID, context) pairs. The partial file has no header row;
+    it is stored in the report store as `part_filename` (or under another name if the storage picks one),
+    to be picked up by `merge_export`.
+    """
+    course_key = CourseKey.from_string(course_id)
+    blocks, context_index = [], {}
+    for block_id, context in shard_blocks:
+        try:
+            block = modulestore().get_item(UsageKey.from_string(block_id))
+        except ItemNotFoundError:
+            # The block may have been deleted since the export started. Don't break in this case.
+            continue
+        blocks.append(block)
+        context_index[block.scope_ids.usage_id] = context
+
+    submitted_after = datetime.fromtimestamp(since, tz=timezone.utc) if since else None
+    rows = _generate_rows(str(course_key), blocks, context_index, user_ids, match_string, submitted_after)
+    row_offsets = array('Q')
     report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
-    report_store.store_rows(course_key, filename, rows)
+    with tempfile.TemporaryFile() as part_file:
+        for chunk in _chunked(rows, EXPORT_CHUNK_SIZE):
+            _write_rows(part_file, chunk, row_offsets)
+        stored_part_filename = _store_file(report_store, course_key, part_filename, part_file)
+    with tempfile.TemporaryFile() as index_file:
+        _write_row_offsets(index_file, row_offsets)
+        stored_index_filename = _store_file(report_store, course_key, part_filename + INDEX_SUFFIX, index_file)
+
+    return {
+        "part_filename": stored_part_filename,
+        "index_filename": stored_index_filename,
+        "num_rows": len(row_offsets),
+    }
+
+
+@shared_task()
+def merge_export(shard_results, course_id, filename, export_id, start_timestamp):
+    """
+    Merges the partial CSV files written by `export_shard` tasks into the final report.
+
+    An index of the byte offset of each row of the report is stored in EXPORT_FILES_DIR,
+    so that pages of results can be read without loading the whole report.
+    """
+    course_key = CourseKey.from_string(course_id)
+    report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+    index_filename = f"{EXPORT_FILES_DIR}/{filename}.{export_id}{INDEX_SUFFIX}"
+    header = io.StringIO()
+    # Adding unicode signature (BOM) for MS Excel 2013 compatibility, like `ReportStore.store_rows` does.
+    header.write('\ufeff')
+    csv.writer(header).writerow(HEADER_ROW)
+    with tempfile.TemporaryFile() as report_file, tempfile.TemporaryFile() as index_file:
+        report_file.write(header.getvalue().encode('utf-8'))
+        for shard_result in shard_results:
+            # The report store has no API to read files back, so use its underlying Django storage.
+            part_path = report_store.path_to(course_key, shard_result["part_filename"])
+            part_index_path = report_store.path_to(course_key, shard_result["index_filename"])
+            # Row offsets in the partial file are relative to its start.
+            part_start = report_file.tell()
+            with report_store.storage.open(part_index_path, 'rb') as part_index_file:
+                row_offsets = _read_row_offsets(part_index_file)
+            _write_row_offsets(index_file, array('Q', (part_start + offset for offset in row_offsets)))
+            with report_store.storage.open(part_path, 'rb') as part_file:
+                shutil.copyfileobj(part_file, report_file)
+            report_store.storage.delete(part_path)
+            report_store.storage.delete(part_index_path)
+        report_filename = _store_file(report_store, course_key, filename, report_file)
+        index_filename = _store_file(report_store, course_key, index_filename, index_file)
 
     generation_time_s = time.time() - start_timestamp
     logger.debug(f"Done data export - took {generation_time_s} seconds")
 
     return {
         "error": None,
-        "report_filename": filename,
+        "report_filename": report_filename,
+        "index_filename": index_filename,
+        "num_results": sum(shard_result["num_rows"] for shard_result in shard_results),
         "start_timestamp": start_timestamp,
         "generation_time_s": generation_time_s,
-        "display_data": [] if len(rows) == 1 else rows[1:1001]  # Limit to preview of 1000 items
     }
 
 
-def _extract_data(course_key_str, block, user_id, match_string):
+@shared_task()
+def delete_export_parts(*args):
+    """
+    Delete the partial reports of the export `export_id`, if its shards or merge failed or it was cancelled.
+
+    This is also an error callback: celery passes it details of the failure first, so the course ID and the
+    export ID given to its signature are the last two arguments.
+    """
+    course_id, export_id = args[-2:]
+    course_key = CourseKey.from_string(course_id)
+    report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+    export_files_path = report_store.path_to(course_key, EXPORT_FILES_DIR)
+    if not report_store.storage.exists(export_files_path):
+        return
+    # The storage may have stored some of them under other names than asked, but the names keep the export ID.
+    for filename in report_store.storage.listdir(export_files_path)[1]:
+        if f".{export_id}.part" in filename:
+            report_store.storage.delete(report_store.path_to(course_key, f"{EXPORT_FILES_DIR}/{filename}"))
+
+
+def read_report_rows(course_key, report_filename, index_filename, start, count):
+    """
+    Return `count` rows of the report `report_filename`, starting from row number `start`.
+
+    Only the requested rows are read, by looking up where they start in the index `index_filename`.
+    """
+    report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+    with report_store.storage.open(report_store.path_to(course_key, index_filename), 'rb') as index_file:
+        index_file.seek(start * ROW_OFFSET_SIZE)
+        row_offsets = _read_row_offsets(index_file, limit=1)
+    if not row_offsets:
+        return []
+    with report_store.storage.open(report_store.path_to(course_key, report_filename), 'rb') as report_file:
+        report_file.seek(row_offsets[0])
+        reader = csv.reader(io.TextIOWrapper(report_file, encoding='utf-8', newline=''))
+        return list(islice(reader, count))
+
+
+def _store_file(report_store, course_key, filename, file):
+    """
+    Store the binary temporary `file` in the report store as `filename`, and return the name it was stored as.
+
+    `ReportStore.store` reads the whole file into memory, so save it with the underlying Django storage instead.
+    The storage may change the name, e.g. if a file with the same name already exists.
+    """
+    file.seek(0)
+    path = report_store.path_to(course_key, filename)
+    stored_path = report_store.storage.save(path, File(file))
+    return stored_path[len(path) - len(filename):]
+
+
+def _write_rows(report_file, rows, row_offsets):
     """
-    Extract results for `block`.
+    Write `rows` as CSV to the binary `report_file`, appending the byte offset of each row to `row_offsets`.
     """
-    rows = []
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        row_offsets.append(report_file.tell())
+        report_file.write(buffer.getvalue().encode('utf-8'))
 
+
+def _write_row_offsets(index_file, row_offsets):
+    """
+    Write the `row_offsets` array to `index_file`, as little-endian unsigned 64-bit integers.
+    """
+    if sys.byteorder != 'little':
+        row_offsets.byteswap()
+    row_offsets.tofile(index_file)
+
+
+def _read_row_offsets(index_file, limit=None):
+    """
+    Read an array of row offsets written by `_write_row_offsets` from `index_file`.
+    """
+    row_offsets = array('Q')
+    row_offsets.frombytes(index_file.read(-1 if limit is None else limit * ROW_OFFSET_SIZE))
+    if sys.byteorder != 'little':
+        row_offsets.byteswap()
+    return row_offsets
+
+
+def scan_for_blocks(root_block, block_types):
+    """
+    Recursively scan the course tree under `root_block` for blocks of `block_types`.
+
+    Returns the ordered list of matching blocks, and a context index mapping the usage ID of each
+    of them to its (section, subsection, unit) names. Ancestor names are passed down the recursion,
+    so only the ancestors of `root_block` itself are looked up with `get_parent()`.
+    """
+    blocks = []
+    context_index = {}
+
+    def scan(block, names_by_type):
+        """ Recursively scan `block`, given the names of its ancestors by block type """
+        if isinstance(block, block_types):
+            blocks.append(block)
+            context_index[block.scope_ids.usage_id] = _get_context_names(names_by_type)
+        elif block.has_children:
+            names_by_type = _add_context_name(block, names_by_type)
+            for child_id in block.children:
+                try:
+                    scan(block.runtime.get_block(child_id), names_by_type)
+                except ItemNotFoundError:
+                    # Blocks may refer to missing children. Don't break in this case.
+                    pass
+
+    scan(root_block, _get_ancestor_names(root_block))
+    return blocks, context_index
+
+
+def _generate_rows(course_key_str, blocks_to_include, context_index, user_ids, match_string, submitted_after=None):
+    """
+    Yield result rows for each block in `blocks_to_include`, without holding them all in memory.
+
+    If `submitted_after` is given, only the students whose latest submission is more recent are included.
+    """
+    if not user_ids:
+        for block in blocks_to_include:
+            context = context_index[block.scope_ids.usage_id]
+            yield from _extract_data(course_key_str, block, context, match_string, submitted_after)
+        return
+
+    # Specific students were requested: fetch their latest submissions to all blocks at once,
+    # and resolve the users once per export, instead of querying for each (block, user) pair.
+    users = get_users_by_anonymous_ids(user_ids)
+    latest_submissions = _get_latest_submissions(course_key_str, blocks_to_include, user_ids, submitted_after)
+    for block in blocks_to_include:
+        item_key = _get_item_key(block)
+        submissions = [
+            latest_submissions[item_key + (user_id,)]
+            for user_id in user_ids
+            if item_key + (user_id,) in latest_submissions
+        ]
+        context = context_index[block.scope_ids.usage_id]
+        yield from _get_rows(block, context, submissions, users, match_string)
+
+
+def _split(items, max_parts):
+    """
+    Split `items` into at most `max_parts` contiguous lists of similar length.
+
+    Always returns at least one (possibly empty) list.
+    """
+    num_parts = max(1, min(len(items), max_parts))
+    part_size, remainder = divmod(len(items), num_parts)
+    parts, start = [], 0
+    for index in range(num_parts):
+        end = start + part_size + (1 if index < remainder else 0)
+        parts.append(items[start:end])
+        start = end
+    return parts
+
+
+def _chunked(iterable, size):
+    """
+    Yield successive lists of at most `size` items from `iterable`.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _extract_data(course_key_str, block, context, match_string, submitted_after=None):
+    """
+    Yield results of all students for `block`, whose (section, subsection, unit) names are `context`.
+    """
+    # Get all of the most recent student submissions for this block, one chunk at a time:
+    submissions = _get_submissions(course_key_str, block, submitted_after, match_string)
+    for submissions_chunk in _chunked(submissions, EXPORT_CHUNK_SIZE):
+        users = get_users_by_anonymous_ids([submission['student_id'] for submission in submissions_chunk])
+        yield from _get_rows(block, context, submissions_chunk, users, match_string)
+
+
+def _get_rows(block, context, submissions, users, match_string):
+    """
+    Yield a row for each of the `submissions` to `block` that matches `match_string`.
+
+    `context` holds the section, subsection and unit names of `block`, and `users` maps
+    anonymous student IDs to (username, user ID, e-mail) tuples.
+    """
     # Extract info for "Section", "Subsection", and "Unit" columns
-    section_name, subsection_name, unit_name = _get_context(block)
+    section_name, subsection_name, unit_name = context
 
     # Extract info for "Type" column
     block_type = _get_type(block)
@@ -113,28 +395,20 @@ def _extract_data(course_key_str, block, user_id, match_string):
     block_question = _get_question(block)
 
     # Extract info for "Answer" and "Username" columns
-    # - Get all of the most recent student submissions for this block:
-    submissions = tuple(_get_submissions(course_key_str, block, user_id))
-
-    # If the student ID key doesn't exist, we're dealing with a single student and know the ID already.
-    student_ids = [submission.get('student_id', user_id) for submission in submissions]
-    users = get_users_by_anonymous_ids(student_ids)
-
     # - For each submission, look up student's username, email and answer:
-    answer_cache = {}
-    for submission in submissions:
-        student_id = submission.get('student_id', user_id)
+    answers = _get_answers(block, submissions)
+    for submission, answer in zip(submissions, answers):
+        student_id = submission['student_id']
         username, _user_id, user_email = users.get(
             student_id,
             (student_id, 'N/A', 'N/A')
         )
-        answer = _get_answer(block, submission, answer_cache)
 
         # Short-circuit if answer does not match search criteria
         if not match_string.lower() in answer.lower():
             continue
 
-        rows.append([
+        yield [
             section_name,
             subsection_name,
             unit_name,
@@ -144,14 +418,12 @@ def _extract_data(course_key_str, block, user_id, match_string):
             username,
             _user_id,
             user_email
-        ])
-
-    return rows
+        ]
 
 
-def _get_context(block):
+def _get_ancestor_names(block):
     """
-    Return section, subsection, and unit names for `block`.
+    Return the display names of `block` and its ancestors, by block type.
     """
     block_names_by_type = {}
     block_iter = block
@@ -159,9 +431,27 @@ def _get_context(block):
         block_iter_type = block_iter.scope_ids.block_type
         block_names_by_type[block_iter_type] = block_iter.display_name_with_default
         block_iter = block_iter.get_parent() if block_iter.parent else None
-    section_name = block_names_by_type.get('chapter', '')
-    subsection_name = block_names_by_type.get('sequential', '')
-    unit_name = block_names_by_type.get('vertical', '')
+    return block_names_by_type
+
+
+def _add_context_name(block, names_by_type):
+    """
+    Return `names_by_type` with the name of `block` added, unless an ancestor of the same type is already there.
+    """
+    block_type = block.scope_ids.block_type
+    if block_type in names_by_type:
+        # Like `_get_ancestor_names`, the outermost block of each type wins.
+        return names_by_type
+    return dict(names_by_type, **{block_type: block.display_name_with_default})
+
+
+def _get_context_names(names_by_type):
+    """
+    Return section, subsection, and unit names from `names_by_type`.
+    """
+    section_name = names_by_type.get('chapter', '')
+    subsection_name = names_by_type.get('sequential', '')
+    unit_name = names_by_type.get('vertical', '')
     return section_name, subsection_name, unit_name
 
 
@@ -179,26 +469,113 @@ def _get_question(block):
     return block.question or block.name
 
 
-def _get_submissions(course_key_str, block, user_id):
+def _get_item_key(block):
     """
-    Return submissions for `block`.
+    Return the (item_id, item_type) pair under which submissions to `block` are stored.
     """
-    # Load the actual student submissions for `block`.
-    # Note this requires one giant query that retrieves all student submissions for `block` at once.
     block_id = str(block.scope_ids.usage_id.replace(branch=None, version_guid=None))
     block_type = _get_type(block)
     if block_type == 'pb-answer':
         block_id = block.name  # item_id of Long Answer submission matches question ID and not block ID
-    if not user_id:
+    return block_id, block_type
+
+
+def _get_submissions(course_key_str, block, submitted_after=None, match_string=None):
+    """
+    Return the most recent submission of every student for `block`.
+
+    If `submitted_after` is given, students whose most recent submission is older are skipped.
+    If `match_string` can be looked up in the stored answers, students whose most recent answer
+    does not contain it are skipped as well; otherwise, the caller has to filter the answers.
+    """
+    # Load the actual student submissions for `block`.
+    # Note this requires one giant query that retrieves all student submissions for `block` at once.
+    block_id, block_type = _get_item_key(block)
+    answer_contains = _get_answer_filter(block, match_string)
+    if not submitted_after and not answer_contains:
         return sub_api.get_all_submissions(course_key_str, block_id, block_type)
-    else:
-        student_dict = {
-            'student_id': user_id,
-            'item_id': block_id,
-            'course_id': course_key_str,
-            'item_type': block_type,
-        }
-        return sub_api.get_submissions(student_dict, limit=1)
+    # The submissions API can't filter submissions, so query them like it would.
+    query = get_submission_queryset().select_related('student_item').filter(
+        student_item__course_id=course_key_str,
+        student_item__item_id=block_id,
+        student_item__item_type=block_type,
+    )
+    if submitted_after:
+        query = query.filter(submitted_at__gt=submitted_after)
+    if answer_contains:
+        # Only the most recent answer of each student counts, so leave out the ones that have been superseded.
+        newer_submissions = get_submission_queryset().filter(student_item=OuterRef('student_item')).filter(
+            Q(submitted_at__gt=OuterRef('submitted_at')) |
+            Q(submitted_at=OuterRef('submitted_at'), id__gt=OuterRef('id'))
+        )
+        query = query.filter(~Exists(newer_submissions), answer__icontains=answer_contains)
+    query = query.order_by('student_item__student_id', '-submitted_at', '-id').iterator()
+    return (
+        _serialize_submission(next(group))
+        for _student_id, group in groupby(query, lambda submission: submission.student_item.student_id)
+    )
+
+
+def _get_answer_filter(block, match_string):
+    """
+    Return the text to look for in the stored answers to `block`, if `match_string` can be matched by the database.
+    """
+    # Only long answers store the searched text as is; other answers are translated to labels first.
+    # Answers are stored JSON-encoded with non-ASCII characters escaped, which breaks case-insensitive
+    # matching of such characters, so leave those searches to the caller too.
+    if not match_string or _get_type(block) != 'pb-answer' or not match_string.isascii():
+        return None
+    return json.dumps(match_string)[1:-1]
+
+
+def _get_latest_submissions(course_key_str, blocks, user_ids, submitted_after=None):
+    """
+    Return the most recent submission of each of `user_ids` for each of `blocks`.
+
+    If `submitted_after` is given, submissions that are not more recent are left out.
+
+    The result maps (item_id, item_type, student_id) to submission dicts. Submissions are loaded
+    with one query per chunk of students, rather than one query per (block, student) pair.
+    """
+    item_keys = {_get_item_key(block) for block in blocks}
+    item_ids = {item_id for item_id, _item_type in item_keys}
+    item_types = {item_type for _item_id, item_type in item_keys}
+    latest_submissions = {}
+    for user_ids_chunk in _chunked(user_ids, EXPORT_CHUNK_SIZE):
+        # Like `sub_api.get_all_submissions`, sort so that the most recent submission comes first in each group.
+        query = get_submission_queryset().select_related('student_item').filter(
+            student_item__course_id=course_key_str,
+            student_item__item_id__in=item_ids,
+            student_item__item_type__in=item_types,
+            student_item__student_id__in=user_ids_chunk,
+        )
+        if submitted_after:
+            query = query.filter(submitted_at__gt=submitted_after)
+        query = query.order_by(
+            'student_item__item_id', 'student_item__item_type', 'student_item__student_id', '-submitted_at', '-id'
+        ).iterator()
+        for key, group in groupby(query, _get_submission_key):
+            if key[:2] in item_keys:
+                latest_submissions[key] = _serialize_submission(next(group))
+    return latest_submissions
+
+
+def _serialize_submission(submission):
+    """
+    Return the fields of the `submission` model that are needed for exports.
+    """
+    return {
+        'student_id': submission.student_item.student_id,
+        'answer': submission.answer,
+    }
+
+
+def _get_submission_key(submission):
+    """
+    Return the (item_id, item_type, student_id) of `submission`.
+    """
+    student_item = submission.student_item
+    return student_item.item_id, student_item.item_type, student_item.student_id
 
 
 def get_users_by_anonymous_ids(anonymous_ids):
@@ -221,16 +598,12 @@ def get_users_by_anonymous_ids(anonymous_ids):
     }
 
 
-def _get_answer(block, submission, answer_cache):
+def _get_answers(block, submissions):
     """
-    Return answer associated with `submission` to `block`.
-
-    `answer_cache` is a dict that is reset for each block.
+    Return the answers of `submissions` to `block`.
     """
-    answer = submission['answer']
+    answers = [submission['answer'] for submission in submissions]
     if isinstance(block, QuestionnaireAbstractBlock):
-        # Convert from answer ID to answer label
-        if answer not in answer_cache:
-            answer_cache[answer] = block.get_submission_display(answer)
-        return answer_cache[answer]
-    return answer
+        # Convert from answer IDs to answer labels
+        return block.get_submission_displays(answers)
+    return answers
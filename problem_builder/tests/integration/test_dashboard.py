@@ -54,6 +54,18 @@ class MockSubmissionsAPI:
             return [self.submissions[key]]
         return []
 
+    def get_all_submissions(self, course_key_str, block_id, block_type, read_replica=True):
+        return (
+            submission for submission in self.submissions.values() if
+            submission['student_item']['item_id'] == block_id
+        )
+
+    def get_latest_answers(self, student_items):
+        return [
+            self.submissions[key]['answer'] if key in self.submissions else None
+            for key in map(self.dict_to_key, student_items)
+        ]
+
 
 def check_dashboard_and_report(fixture, set_mentoring_values=True, **kwargs):
     """
@@ -136,8 +148,9 @@ class TestDashboardBlock(ProblemBuilderBaseTest):
                 ))
             ),
             ("problem_builder.dashboard.DashboardBlock.get_mentoring_blocks", get_mentoring_blocks),
-            ("problem_builder.dashboard.sub_api", mock_submisisons_api),
+            ("problem_builder.dashboard.get_latest_answers", mock_submisisons_api.get_latest_answers),
             ("problem_builder.mcq.sub_api", mock_submisisons_api),
+            ("problem_builder.sub_api.sub_api", mock_submisisons_api),
             (
                 "problem_builder.mentoring.MentoringBlock.url_name",
                 property(lambda block: block.display_name)
@@ -24,14 +24,6 @@ class HTMLColors:
     CRIMSON = 'rgb(220, 20, 60)'
 
 
-class ExtendedMockSubmissionsAPI(MockSubmissionsAPI):
-    def get_all_submissions(self, course_key_str, block_id, block_type):
-        return (
-            submission for submission in self.submissions.values() if
-            submission['student_item']['item_id'] == block_id
-        )
-
-
 class MultipleSliderBlocksTestMixins():
     """ Mixins for testing slider blocks. Allows multiple slider blocks on the page. """
 
@@ -53,7 +45,7 @@ class StepBuilderTest(MentoringAssessmentBaseTest, MultipleSliderBlocksTestMixin
     def setUp(self):
         super().setUp()
 
-        mock_submissions_api = ExtendedMockSubmissionsAPI()
+        mock_submissions_api = MockSubmissionsAPI()
         patches = (
             (
                 "problem_builder.plot.PlotBlock.course_key_str",
@@ -63,6 +55,14 @@ class StepBuilderTest(MentoringAssessmentBaseTest, MultipleSliderBlocksTestMixin
                 "problem_builder.plot.sub_api",
                 mock_submissions_api
             ),
+            (
+                "problem_builder.plot.get_latest_answers",
+                mock_submissions_api.get_latest_answers
+            ),
+            (
+                "problem_builder.plot.AVERAGE_CACHE_TIMEOUT",
+                0  # Check that averages are updated as soon as answers are submitted
+            ),
             (
                 "problem_builder.mcq.sub_api",
                 mock_submissions_api
@@ -71,6 +71,10 @@ class StepBuilderTest(MentoringAssessmentBaseTest, MultipleSliderBlocksTestMixin
                 "problem_builder.slider.sub_api",
                 mock_submissions_api
             ),
+            (
+                "problem_builder.sub_api.sub_api",
+                mock_submissions_api
+            ),
             (
                 "problem_builder.sub_api.SubmittingXBlockMixin.student_item_key",
                 property(
@@ -5,11 +5,15 @@ import json
 import unittest
 from collections import namedtuple
 from datetime import datetime
+from unittest.mock import Mock, patch
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.crypto import get_random_string
+from xblock.field_data import DictFieldData
 
-from problem_builder.answer import AnswerMixin
+from problem_builder.answer import AnswerBlock, AnswerMixin, prefetch_answers
 from problem_builder.models import Answer
 
 
@@ -37,14 +41,11 @@ class TestAnswerMixin(unittest.TestCase):
         answer_mixin.has_children = False
         return answer_mixin
 
-    def test_creates_model_instance(self):
+    def test_missing_answer_is_not_created(self):
         name = 'test-model-creation'
         answer_mixin = self.make_answer_mixin(name=name)
-        model = answer_mixin.get_model_object()
-        self.assertEqual(model.name, name)
-        self.assertEqual(model.student_id, self.anonymous_student_id)
-        self.assertEqual(model.course_key, self.course_id)
-        self.assertEqual(Answer.objects.get(pk=model.pk), model)
+        self.assertEqual(answer_mixin.student_input, '')
+        self.assertFalse(Answer.objects.filter(name=name).exists())
 
     def test_finds_instance_by_course_key(self):
         name = 'test-course-key'
@@ -52,18 +53,19 @@ class TestAnswerMixin(unittest.TestCase):
             name=name,
             student_id=self.anonymous_student_id,
             course_key=self.course_id,
+            student_input='Test',
         )
         existing_model.save()
+        Answer(name=name, student_id=self.anonymous_student_id, course_key='other-course', student_input='Other').save()
         answer_mixin = self.make_answer_mixin(name=name)
-        model = answer_mixin.get_model_object()
-        self.assertEqual(model, existing_model)
+        self.assertEqual(answer_mixin.student_input, 'Test')
 
     def test_works_with_long_course_keys(self):
         course_id = 'course-v1:VeryLongOrganizationName+VeryLongCourseNumber+VeryLongCourseRun'
         self.assertTrue(len(course_id) > 50)  # precondition check
         answer_mixin = self.make_answer_mixin(course_id=course_id)
-        model = answer_mixin.get_model_object()
-        self.assertEqual(model.course_key, course_id)
+        Answer.save_student_input(self.anonymous_student_id, course_id, answer_mixin.name, 'Test')
+        self.assertEqual(answer_mixin.get_answer_input(answer_mixin.name), 'Test')
 
     def test_build_user_state_data(self):
         name = 'test-course-key-2'
@@ -104,3 +106,66 @@ class TestAnswerMixin(unittest.TestCase):
             "student_input": existing_model.student_input,
         }
         self.assertEqual(parsed_student_state, expected_user_state_data)
+
+    def test_student_input_does_not_create_model_instance(self):
+        answer_mixin = self.make_answer_mixin(name='test-read-only')
+        self.assertEqual(answer_mixin.student_input, '')
+        self.assertFalse(Answer.objects.filter(name='test-read-only').exists())
+
+    def test_prefetch_answers(self):
+        for name, student_input in (('answer-1', 'First'), ('answer-2', ''), ('answer-0', 'Default')):
+            Answer.objects.create(
+                name=name, student_id=self.anonymous_student_id, course_key=self.course_id, student_input=student_input
+            )
+        answer_mixins = [self.make_answer_mixin(name=name) for name in ('answer-1', 'answer-2', 'answer-3')]
+        answer_mixins[1].default_from = 'answer-0'
+        other_student_mixin = self.make_answer_mixin(name='answer-1', student_id='other-student')
+
+        with CaptureQueriesContext(connection) as queries:
+            prefetch_answers(answer_mixins + [other_student_mixin, None])
+            student_inputs = [answer_mixin.student_input for answer_mixin in answer_mixins]
+            other_student_input = other_student_mixin.student_input
+
+        self.assertEqual(student_inputs, ['First', 'Default', ''])
+        self.assertEqual(other_student_input, '')
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(Answer.objects.count(), 3)
+
+
+@pytest.mark.django_db
+class TestAnswerBlockSubmit(unittest.TestCase):
+    """ Unit tests for AnswerBlock.submit. """
+
+    def setUp(self):
+        self.course_id = 'course-v1:edX+DemoX+Demo_Course'
+        runtime = Mock(course_id=self.course_id, anonymous_student_id='12345678987654321')
+        self.block = AnswerBlock(runtime, DictFieldData({'name': 'answer'}), Mock())
+        self.block.location = Mock()
+        self.sub_api = Mock()
+        for target in ('problem_builder.answer.sub_api', 'problem_builder.sub_api.sub_api'):
+            patcher = patch(target, self.sub_api)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(AnswerBlock, 'student_item_key', {'item_id': 'block'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, value):
+        block = AnswerBlock(self.block.runtime, self.block._field_data, self.block.scope_ids)
+        block.location = self.block.location
+        with CaptureQueriesContext(connection) as queries:
+            block.submit({'value': value})
+        return len(queries)
+
+    def test_submit_changed_answers(self):
+        self.assertEqual(self.submit(' First '), 2)  # Read the stored answer, then upsert it
+        self.assertEqual(self.submit('Second'), 2)
+        self.assertEqual(Answer.objects.get(name='answer').student_input, 'Second')
+        self.assertEqual(
+            [args[1] for args, _kwargs in self.sub_api.create_submission.call_args_list], ['First', 'Second']
+        )
+
+    def test_submit_unchanged_answer(self):
+        self.submit('First')
+        self.assertEqual(self.submit('First '), 1)  # Only read the stored answer
+        self.assertEqual(self.sub_api.create_submission.call_count, 1)
@@ -0,0 +1,61 @@
+"""
+Unit tests for DashboardBlock color rules
+"""
+import unittest
+from unittest.mock import Mock
+
+from xblock.field_data import DictFieldData
+
+from problem_builder.dashboard import (ColorRule, DashboardBlock,
+                                       get_color_rules)
+
+
+class TestColorRule(unittest.TestCase):
+    """
+    Test compilation and evaluation of color rule expressions
+    """
+    def test_matches(self):
+        rule = ColorRule("3 < x <= 5 or x == 0", color_str="red")
+        self.assertEqual([rule.matches(x) for x in range(7)], [True, False, False, False, True, True, False])
+
+    def test_division_by_zero_does_not_match(self):
+        rule = ColorRule("1 / x > 0.5", color_str="red")
+        self.assertFalse(rule.matches(0))
+        self.assertTrue(rule.matches(1))
+
+    def test_invalid_expressions(self):
+        for rule_str in ("x ** 2", "y > 1", "x.real", "'a' == x", "x >"):
+            with self.assertRaises(ValueError):
+                ColorRule(rule_str, color_str="red")
+
+    def test_safe_eval_expression(self):
+        self.assertEqual(ColorRule._safe_eval_expression('2*x', x=3), 6)
+        self.assertEqual(ColorRule._safe_eval_expression('x >= 0 and x < 2', x=3), False)
+        self.assertEqual(ColorRule._safe_eval_expression('0 or x - 3', x=3), 0)
+
+
+class TestDashboardColors(unittest.TestCase):
+    """
+    Test DashboardBlock.colors_for_values
+    """
+    COLOR_RULES = "1: red\n2 <= x < 4: yellow\ninvalid rule: gray\nx >= 4: green"
+
+    def make_block(self, color_rules):
+        return DashboardBlock(Mock(), DictFieldData({'color_rules': color_rules}), Mock())
+
+    def test_compiled_rules_are_shared(self):
+        get_color_rules.cache_clear()
+        rules = self.make_block(self.COLOR_RULES).color_rules_parsed
+        self.assertEqual([rule.color_str for rule in rules], ["red", "yellow", "green"])
+        self.assertIs(self.make_block(self.COLOR_RULES).color_rules_parsed, rules)
+        self.assertEqual(get_color_rules.cache_info().misses, 1)
+
+    def test_colors_for_values(self):
+        block = self.make_block(self.COLOR_RULES)
+        values = ["1", "3", None, "n/a", 4.5, "3", 0.5]
+        self.assertEqual(block.colors_for_values(values), ["red", "yellow", None, None, "green", "yellow", None])
+        self.assertEqual(block.color_for_value("2"), "yellow")
+
+    def test_no_rules(self):
+        block = self.make_block("")
+        self.assertEqual(block.colors_for_values(["1", 2.0]), [None, None])
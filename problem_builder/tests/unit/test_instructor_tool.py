@@ -1,6 +1,7 @@
 """
 Unit tests for Instructor Tool block
 """
+import json
 import unittest
 from unittest.mock import Mock, patch
 
@@ -8,6 +9,7 @@ import ddt
 from xblock.field_data import DictFieldData
 
 from problem_builder.instructor_tool import (COURSE_BLOCKS_API,
+                                             MAX_EXPORT_TIMESTAMPS, PAGE_SIZE,
                                              InstructorToolBlock)
 
 
@@ -87,3 +89,153 @@ class TestInstructorToolBlock(unittest.TestCase):
         except AttributeError:
             self.fail('Studio view not defined.')
         self.assertIn('This is a preconfigured block. It is not editable.', fragment.content)
+
+    def _patch_tasks(self, ready_task_ids=()):
+        """
+        Patch the LMS-specific tasks module, with the given task IDs reporting that they are ready.
+        """
+        tasks_mock = Mock()
+        async_results = {}
+
+        def get_async_result(task_id):
+            if task_id not in async_results:
+                async_results[task_id] = Mock(id=task_id, ready=Mock(return_value=task_id in ready_task_ids))
+            return async_results[task_id]
+
+        tasks_mock.export_data.AsyncResult.side_effect = get_async_result
+        return patch.dict('sys.modules', {'problem_builder.tasks': tasks_mock}), async_results
+
+    def test_sharded_export_follows_merge_task(self):
+        """
+        Check that once a sharded export has been dispatched, the block waits for the task merging its shards.
+        """
+        dispatch_result = Mock()
+        dispatch_result.successful.return_value = True
+        dispatch_result.result = {
+            'error': None,
+            'merge_task_id': 'merge_task_id',
+            'shard_task_ids': ['shard_0', 'shard_1', 'shard_2'],
+        }
+        self.block._save_result(dispatch_result)
+
+        self.assertEqual(self.block.active_export_task_id, 'merge_task_id')
+        self.assertEqual(self.block.active_export_shard_ids, ['shard_0', 'shard_1', 'shard_2'])
+        self.assertIsNone(self.block.last_export_result)
+
+        tasks_patch, _async_results = self._patch_tasks(ready_task_ids=('shard_0', 'shard_2'))
+        with tasks_patch, patch.object(InstructorToolBlock, 'download_url_for_last_report', None):
+            status = self.block._get_status()
+        self.assertTrue(status['export_pending'])
+        self.assertEqual(status['export_progress'], {'completed': 2, 'total': 3})
+
+    def test_cancel_sharded_export(self):
+        """
+        Check that cancelling a sharded export revokes the merge task and all of the shards,
+        and deletes their partial reports.
+        """
+        self.block.active_export_task_id = 'merge_task_id'
+        self.block.active_export_shard_ids = ['shard_0', 'shard_1']
+
+        tasks_patch, async_results = self._patch_tasks()
+        with tasks_patch as patched_modules:
+            self.block.cancel_export(Mock(method='POST', body=b'{}'))
+            delete_export_parts = patched_modules['problem_builder.tasks'].delete_export_parts
+
+        self.assertEqual(set(async_results), {'merge_task_id', 'shard_0', 'shard_1'})
+        async_results['merge_task_id'].revoke.assert_called_once_with(terminate=False)
+        async_results['shard_0'].revoke.assert_called_once_with(terminate=True)
+        async_results['shard_1'].revoke.assert_called_once_with(terminate=True)
+        delete_export_parts.delay.assert_called_once_with(
+            str(self.block.runtime.course_id), 'merge_task_id'
+        )
+        self.assertEqual(self.block.active_export_task_id, '')
+        self.assertEqual(self.block.active_export_shard_ids, [])
+
+    def _run_export(self, start_timestamp, **data):
+        """
+        Run an export that finishes right away, and return the `since` timestamp it was started with.
+        """
+        data = dict({'block_types': 'all', 'root_block_id': 'chapter'}, **data)
+        tasks_patch, _async_results = self._patch_tasks()
+        with tasks_patch as patched_modules, \
+                patch.object(InstructorToolBlock, 'user_is_staff', Mock(return_value=True)), \
+                patch.object(InstructorToolBlock, 'download_url_for_last_report', None):
+            export_data_task = patched_modules['problem_builder.tasks'].export_data
+            async_result = export_data_task.delay.return_value
+            async_result.ready.return_value = True
+            async_result.successful.return_value = True
+            async_result.result = {
+                'error': None,
+                'report_filename': 'report.csv',
+                'start_timestamp': start_timestamp,
+                'generation_time_s': 1.0,
+                'display_data': [],
+            }
+            self.block.start_export(Mock(method='POST', body=json.dumps(data).encode('utf-8')))
+        return export_data_task.delay.call_args[0][-1]
+
+    def test_incremental_export(self):
+        """
+        Check that incremental exports only ask for submissions made since the last successful export.
+        """
+        self.assertIsNone(self._run_export(1000.0, incremental=True))
+        self.assertEqual(self._run_export(2000.0, incremental=True), 1000.0)
+        self.assertIsNone(self._run_export(3000.0, incremental=False))
+        self.assertEqual(self._run_export(4000.0, incremental=True), 3000.0)
+        self.assertEqual(self.block.active_export_key, '')
+
+    def test_incremental_export_with_other_parameters(self):
+        """
+        Check that exports of only some of the submissions don't affect incremental exports of others.
+        """
+        self.service_mock.get_anonymous_user_id.return_value = 'anonymous-student'
+        self._run_export(1000.0)
+        self.assertIsNone(self._run_export(2000.0, incremental=True, usernames='student'))
+        self.assertIsNone(self._run_export(3000.0, incremental=True, match_string='answer'))
+        self.assertIsNone(self._run_export(4000.0, incremental=True, block_types='MCQBlock'))
+        self.assertEqual(self._run_export(5000.0, incremental=True), 1000.0)
+        self.assertEqual(self._run_export(6000.0, incremental=True, usernames=' student'), 2000.0)
+        # Searches are always exported in full, and not remembered.
+        self.assertIsNone(self._run_export(7000.0, incremental=True, match_string='answer'))
+        self.assertEqual(len(self.block.last_export_timestamps), 3)
+
+    def test_export_timestamps_are_capped(self):
+        """
+        Check that only the parameters of the most recent exports are remembered.
+        """
+        for index in range(MAX_EXPORT_TIMESTAMPS + 2):
+            self._run_export(1000.0 + index, root_block_id=f'chapter{index}')
+        self.assertEqual(len(self.block.last_export_timestamps), MAX_EXPORT_TIMESTAMPS)
+        self.assertEqual(self._run_export(3000.0, incremental=True, root_block_id='chapter2'), 1002.0)
+        self.assertIsNone(self._run_export(4000.0, incremental=True, root_block_id='chapter1'))
+        # Exporting chapter1 again made chapter3 the least recently exported.
+        self.assertIsNone(self._run_export(5000.0, incremental=True, root_block_id='chapter3'))
+
+    def test_get_result_page_reads_page_from_report(self):
+        """
+        Check that results are paged by reading only the rows of the requested page from the report.
+        """
+        export_result = Mock()
+        export_result.successful.return_value = True
+        export_result.result = {
+            'error': None,
+            'report_filename': 'report.csv',
+            'index_filename': 'report.csv.idx',
+            'num_results': 40,
+            'start_timestamp': 1234.5,
+            'generation_time_s': 1.0,
+        }
+        self.block._save_result(export_result)
+        self.assertIsNone(self.block.display_data)
+
+        tasks_mock = Mock()
+        tasks_mock.read_report_rows.return_value = [['row']] * 10
+        with patch.dict('sys.modules', {'problem_builder.tasks': tasks_mock}):
+            response = self.block.get_result_page(Mock(method='POST', body=b'{"page": 3}'))
+
+        tasks_mock.read_report_rows.assert_called_once_with(None, 'report.csv', 'report.csv.idx', 30, 10)
+        self.assertEqual(json.loads(response.body.decode('utf-8')), {
+            'display_data': [['row']] * 10,
+            'num_results': 40,
+            'page_size': PAGE_SIZE,
+        })
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock, Mock
 from xblock.field_data import DictFieldData
 
 from problem_builder.mentoring import MentoringBlock
+from problem_builder.step import MentoringStepBlock
 
 
 class TestFieldMigration(unittest.TestCase):
@@ -32,10 +33,39 @@ class TestFieldMigration(unittest.TestCase):
         mentoring = MentoringBlock(MagicMock(), DictFieldData({'student_results': student_results}), Mock())
         self.assertEqual(copy.deepcopy(student_results), mentoring.student_results)
 
-        migrated_student_results = copy.deepcopy(student_results)
-        migrated_student_results[0][1]['status'] = 'correct'
-        migrated_student_results[1][1]['status'] = 'incorrect'
-        del migrated_student_results[0][1]['completed']
-        del migrated_student_results[1][1]['completed']
         mentoring.migrate_fields()
-        self.assertEqual(migrated_student_results, mentoring.student_results)
+        self.assertEqual(mentoring.student_results, [
+            ['goal', {'status': 'correct', 'score': 1}],
+            ['mcq_1_1', {'status': 'incorrect', 'score': 0, 'submission': 'maybenot'}],
+        ])
+
+    def test_compact_results_migration(self):
+        """
+        Tips, messages and weights are no longer stored in `self.student_results`
+        """
+        student_results = [
+            ['mcq_1_1',
+                {'status': 'correct',
+                 'score': 1,
+                 'submission': 'yes',
+                 'message': '<p>Message</p>',
+                 'tips': '<div class="tip-choice-group">Tip</div>',
+                 'weight': 1}],
+            ['mrq_1_1',
+                {'status': 'partial',
+                 'score': 0.5,
+                 'submissions': ['elegance'],
+                 'choices': [{'value': 'elegance', 'selected': True, 'tips': '<div>Tip</div>'}],
+                 'weight': 1}],
+        ]
+        compact_student_results = [
+            ['mcq_1_1', {'status': 'correct', 'score': 1, 'submission': 'yes'}],
+            ['mrq_1_1', {'status': 'partial', 'score': 0.5, 'submissions': ['elegance']}],
+        ]
+        mentoring = MentoringBlock(MagicMock(), DictFieldData({'student_results': student_results}), Mock())
+        mentoring.migrate_fields()
+        self.assertEqual(mentoring.student_results, compact_student_results)
+
+        step = MentoringStepBlock(MagicMock(), DictFieldData({'student_results': student_results}), Mock())
+        step.compact_student_results()
+        self.assertEqual(step.student_results, compact_student_results)
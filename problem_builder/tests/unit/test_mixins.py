@@ -1,14 +1,15 @@
 import json
 import unittest
 from datetime import datetime
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 
 import pytz
 from xblock.core import XBlock
 from xblock.field_data import DictFieldData
 from xblock.fields import Boolean, DateTime, Integer, Scope, String
 
-from problem_builder.mixins import StudentViewUserStateMixin
+from problem_builder.mixins import (PrefetchChildrenMixin,
+                                    StudentViewUserStateMixin)
 
 
 class NoUserStateFieldsMixin:
@@ -60,6 +61,10 @@ class XBlockChildrenUserState(
     has_children = True
 
 
+class XBlockPrefetchingChildren(XBlock, NoUserStateFieldsMixin, ChildrenMixin, PrefetchChildrenMixin):
+    has_children = True
+
+
 class TestStudentViewUserStateMixin(unittest.TestCase):
     def setUp(self):
         self._runtime = MagicMock()
@@ -279,3 +284,51 @@ class TestStudentViewUserStateMixin(unittest.TestCase):
         expected["user_info_2"] = expected["user_info_2"].isoformat()
         expected["components"] = {"child1": {}}
         self.assertEqual(student_user_state, expected)
+
+
+class TestPrefetchChildrenMixin(unittest.TestCase):
+    def setUp(self):
+        self._runtime = MagicMock()
+        self._field_data = {
+            "step_question": {"answer_1": "AAAA"},
+            "question": {"answer_1": "BBBB"},
+        }
+        self.step = XBlockPrefetchingChildren(self._runtime, DictFieldData({}), Mock())
+        self.step.children = ["step_question"]
+        self.blocks = {
+            "step": self.step,
+            "step_question": self._build_question("step_question"),
+            "question": self._build_question("question"),
+        }
+        self._runtime.get_block.side_effect = self.blocks.get
+        self.block = XBlockPrefetchingChildren(self._runtime, DictFieldData({}), Mock())
+        self.block.children = ["step", "question"]
+
+    def _build_question(self, name):
+        field_data = Mock(wraps=DictFieldData(self._field_data[name]))
+        return XBlockChildrenUserState(self._runtime, field_data, Mock())
+
+    def test_children_are_loaded_once(self):
+        for _ in range(3):
+            for child_id in ("step", "question", "step_question"):
+                self.assertIs(self.block.get_child_block(child_id), self.blocks[child_id])
+            self.assertIs(self.step.get_child_block("step_question"), self.blocks["step_question"])
+
+        self.assertEqual(self._runtime.get_block.call_count, 3)
+
+    def test_children_are_loaded_lazily(self):
+        self.assertIs(self.block.get_child_block("question"), self.blocks["question"])
+        self._runtime.get_block.assert_called_once_with("question")
+        self.assertIs(self.block.get_child_block("step"), self.blocks["step"])
+        self.assertIs(self.step.get_child_block("step_question"), self.blocks["step_question"])
+        self.assertIs(self.block.get_child_block("step_question"), self.blocks["step_question"])
+        self.assertEqual(self._runtime.get_block.call_count, 3)
+
+    def test_prefetch_answers(self):
+        with patch('problem_builder.answer.prefetch_answers') as prefetch_answers:
+            self.block.prefetch_answers()
+        prefetch_answers.assert_called_once()
+        self.assertCountEqual(prefetch_answers.call_args[0][0], self.blocks.values())
+        # The loaded blocks are shared with the children
+        self.assertIs(self.step.get_child_block("step_question"), self.blocks["step_question"])
+        self.assertEqual(self._runtime.get_block.call_count, 3)
@@ -1,11 +1,15 @@
 """
 Unit tests for models.
 """
-from unittest.mock import MagicMock, PropertyMock
+from unittest.mock import MagicMock, PropertyMock, patch
 
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
 
-from problem_builder.models import Answer, delete_anonymous_user_answers
+from problem_builder.models import (Answer, AnswerAggregate,
+                                    delete_anonymous_user_answers,
+                                    delete_reset_answer_aggregate)
 
 
 class AnswerDeleteSignalTest(TestCase):
@@ -40,3 +44,95 @@ class AnswerDeleteSignalTest(TestCase):
         delete_anonymous_user_answers(MagicMock(), instance=anonymous_user_id_mock)
         self.assertEqual(Answer.objects.filter(student_id=self.anonymous_student_id).count(), 0)
         self.assertEqual(Answer.objects.exclude(student_id=self.anonymous_student_id).count(), 1)
+
+
+class AnswerSaveStudentInputTest(TestCase):
+    """ Unit tests for upserting answers. """
+
+    def test_save_student_input(self):
+        course_id = 'course-v1:edX+DemoX+Demo_Course'
+        with self.assertNumQueries(1):
+            Answer.save_student_input('student', course_id, 'answer', 'First')
+        answer = Answer.objects.get(student_id='student', course_key=course_id, name='answer')
+        self.assertEqual(answer.student_input, 'First')
+
+        with self.assertNumQueries(1):
+            Answer.save_student_input('student', course_id, 'answer', 'Second')
+        updated_answer = Answer.objects.get(pk=answer.pk)
+        self.assertEqual(updated_answer.student_input, 'Second')
+        self.assertEqual(updated_answer.created_on, answer.created_on)
+        self.assertGreaterEqual(updated_answer.modified_on, answer.modified_on)
+        self.assertEqual(Answer.objects.count(), 1)
+
+    def test_save_student_input_without_conflict_target(self):
+        # MySQL upserts on any unique key, and Django refuses to be given the fields of the one to use
+        with patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            Answer.save_student_input('student', 'course', 'answer', 'Input')
+        self.assertEqual(Answer.objects.get(student_id='student', course_key='course').student_input, 'Input')
+
+    def test_save_student_input_validates_length(self):
+        with self.assertRaises(ValidationError):
+            Answer.save_student_input('student', 'course', 'a' * 51, 'Input')
+
+
+class AnswerAggregateTest(TestCase):
+    """ Unit tests for maintaining aggregated answers. """
+
+    def setUp(self):
+        super().setUp()
+        self.student_item = {
+            'student_id': 'student',
+            'course_id': 'course-v1:edX+DemoX+Demo_Course',
+            'item_id': 'block-v1:edX+DemoX+Demo_Course+type@pb-rating+block@rating',
+            'item_type': 'pb-rating',
+        }
+
+    def get_aggregate(self):
+        return AnswerAggregate.objects.get(
+            course_key=self.student_item['course_id'],
+            item_id=self.student_item['item_id'],
+            item_type=self.student_item['item_type'],
+        )
+
+    def create_aggregate(self):
+        AnswerAggregate.objects.create(
+            course_key=self.student_item['course_id'],
+            item_id=self.student_item['item_id'],
+            item_type=self.student_item['item_type'],
+        )
+
+    def test_record_answers(self):
+        self.create_aggregate()
+        self.assertTrue(AnswerAggregate.record_answer(self.student_item, 4))
+        self.assertTrue(AnswerAggregate.record_answer(dict(self.student_item, student_id='other'), 1))
+        aggregate = self.get_aggregate()
+        self.assertEqual((aggregate.num_answers, aggregate.total), (2, 5))
+        self.assertEqual(aggregate.average, 2.5)
+
+    def test_record_answer_without_aggregate(self):
+        self.assertFalse(AnswerAggregate.record_answer(self.student_item, 4, previous_value=2))
+        self.assertFalse(AnswerAggregate.objects.exists())
+
+    def test_record_changed_answer(self):
+        self.create_aggregate()
+        AnswerAggregate.record_answer(self.student_item, 4)
+        AnswerAggregate.record_answer(self.student_item, 2, previous_value=4)
+        aggregate = self.get_aggregate()
+        self.assertEqual((aggregate.num_answers, aggregate.total), (1, 2))
+
+    def test_record_non_numeric_answers(self):
+        self.create_aggregate()
+        self.assertTrue(AnswerAggregate.record_answer(self.student_item, None))
+        AnswerAggregate.record_answer(self.student_item, 3)
+        AnswerAggregate.record_answer(self.student_item, None, previous_value=3)
+        aggregate = self.get_aggregate()
+        self.assertEqual((aggregate.num_answers, aggregate.total), (0, 0))
+        self.assertIsNone(aggregate.average)
+
+    def test_reset_deletes_aggregate(self):
+        self.create_aggregate()
+        delete_reset_answer_aggregate(
+            None, anonymous_user_id='student', course_id=self.student_item['course_id'],
+            item_id=self.student_item['item_id'], created_at=None,
+        )
+        self.assertFalse(AnswerAggregate.objects.exists())
@@ -0,0 +1,143 @@
+"""
+Unit tests for PlotBlock
+"""
+import unittest
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from xblock.field_data import DictFieldData
+
+from problem_builder.models import AnswerAggregate
+from problem_builder.plot import (AVERAGE_CACHE_REFRESH_TIMEOUT,
+                                  AVERAGE_CACHE_STATS_KEYS,
+                                  AVERAGE_CACHE_WAIT_CHECKS, PlotBlock,
+                                  _get_cached_average, get_average_cache_stats)
+
+
+class TestAverageCache(unittest.TestCase):
+    """
+    Test caching of course-wide average responses
+    """
+    KEY = 'problem_builder.plot.average.test'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def get_average(self, compute, now):
+        with patch('problem_builder.plot.time.time', return_value=now):
+            return _get_cached_average(self.KEY, 100, compute)
+
+    def test_cached_until_timeout(self):
+        compute = Mock(return_value=2.5)
+        self.assertEqual(self.get_average(compute, now=1000), 2.5)
+        compute.return_value = 3
+        self.assertEqual(self.get_average(compute, now=1099), 2.5)
+        self.assertEqual(self.get_average(compute, now=1100), 3)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(get_average_cache_stats(), {'hits': 1, 'misses': 2, 'stale_hits': 0})
+
+    def test_no_answers_are_cached(self):
+        compute = Mock(return_value=None)
+        self.assertIsNone(self.get_average(compute, now=1000))
+        self.assertIsNone(self.get_average(compute, now=1001))
+        self.assertEqual(compute.call_count, 1)
+
+    def test_stale_value_served_during_refresh(self):
+        self.get_average(Mock(return_value=2.5), now=1000)
+        cache.add(self.KEY + ':refresh', True, AVERAGE_CACHE_REFRESH_TIMEOUT)  # Another request is refreshing
+        compute = Mock(return_value=3)
+        self.assertEqual(self.get_average(compute, now=1200), 2.5)
+        compute.assert_not_called()
+        self.assertEqual(get_average_cache_stats()['stale_hits'], 1)
+
+        cache.delete(self.KEY + ':refresh')
+        self.assertEqual(self.get_average(compute, now=1200), 3)
+        self.assertIsNone(cache.get(self.KEY + ':refresh'))
+
+    def test_missing_value_computed_once(self):
+        cache.add(self.KEY + ':refresh', True, AVERAGE_CACHE_REFRESH_TIMEOUT)  # Another request is computing it
+        compute = Mock(return_value=3)
+        with patch('problem_builder.plot.time.sleep') as sleep:
+            sleep.side_effect = lambda seconds: cache.set(self.KEY, (2.5, 1100)) if sleep.call_count == 2 else None
+            self.assertEqual(self.get_average(compute, now=1000), 2.5)
+        compute.assert_not_called()
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(get_average_cache_stats(), {'hits': 1, 'misses': 0, 'stale_hits': 0})
+
+    def test_missing_value_computed_after_waiting(self):
+        cache.add(self.KEY + ':refresh', True, AVERAGE_CACHE_REFRESH_TIMEOUT)  # Another request is computing it
+        compute = Mock(return_value=3)
+        with patch('problem_builder.plot.time.sleep') as sleep:
+            self.assertEqual(self.get_average(compute, now=1000), 3)
+        self.assertEqual(sleep.call_count, AVERAGE_CACHE_WAIT_CHECKS)
+        compute.assert_called_once_with()
+        # The lock of the other request is left alone
+        self.assertTrue(cache.get(self.KEY + ':refresh'))
+
+    def test_stats_counted_with_one_round_trip(self):
+        self.get_average(Mock(return_value=2.5), now=1000)
+        with patch('problem_builder.plot.cache') as mock_cache:
+            mock_cache.get.return_value = (2.5, 1100)
+            self.get_average(Mock(), now=1050)
+        mock_cache.incr.assert_called_once_with(AVERAGE_CACHE_STATS_KEYS['hits'])
+        mock_cache.add.assert_not_called()
+
+
+class TestPlotClaims(unittest.TestCase):
+    """
+    Test resolution of the responses shown for each claim
+    """
+    def setUp(self):
+        super().setUp()
+        self.questions = []
+        for url_name, block_type in (('q1', 'pb-rating'), ('q2', 'pb-slider'), ('q3', 'pb-mcq')):
+            question = Mock(url_name=url_name)
+            question.scope_ids.block_type = block_type
+            question.get_submission_display = lambda answer: answer * 10
+            self.questions.append(question)
+        mentoring_block = Mock(question_ids=['id1', 'id2', 'id3'], questions=self.questions)
+        self.block = PlotBlock(Mock(anonymous_student_id='student'), DictFieldData({
+            'claims': 'Claim A, q1, q2\nClaim B, q2, q_deleted',
+        }), Mock())
+        self.block.get_parent = lambda: Mock(get_parent=lambda: mentoring_block)
+        self.block.course_key_str = 'course'
+
+        patcher = patch('problem_builder.plot.get_latest_answers', return_value=[1, None])
+        self.get_latest_answers = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(PlotBlock, '_get_average_response', side_effect=lambda question, _id: question.url_name)
+        self.get_average_response = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_claims(self):
+        self.assertEqual(self.block.default_claims, [['Claim A', 10, None], ['Claim B', None, None]])
+        self.assertEqual(self.block.average_claims, [['Claim A', 'q1', 'q2'], ['Claim B', 'q2', None]])
+        self.assertEqual(self.block.claims_display, [['Claim A', 'q1', 'q2'], ['Claim B', 'q2', 'q_deleted']])
+
+    def test_responses_resolved_once(self):
+        self.block.default_claims_json()
+        self.block.average_claims_json()
+        self.block.build_user_state_data()
+
+        self.get_latest_answers.assert_called_once_with([
+            {'student_id': 'student', 'course_id': 'course', 'item_id': 'id1', 'item_type': 'pb-rating'},
+            {'student_id': 'student', 'course_id': 'course', 'item_id': 'id2', 'item_type': 'pb-slider'},
+        ])
+        self.assertEqual(self.get_average_response.call_count, 2)
+
+    def test_no_claims(self):
+        self.block.claims = ''
+        self.assertEqual(self.block.default_claims, [])
+        self.get_latest_answers.assert_not_called()
+
+    def test_average_from_submissions(self):
+        question = self.questions[1]
+        question.get_submission_displays = Mock(side_effect=lambda answers: [answer * 100 for answer in answers])
+        answers = [0.5, 0.25, 0.5, 0.75]
+        with patch('problem_builder.plot.AnswerAggregate.objects.get', side_effect=AnswerAggregate.DoesNotExist), \
+                patch('problem_builder.plot.sub_api') as sub_api:
+            sub_api.get_all_submissions.return_value = ({'answer': answer} for answer in answers)
+            self.assertEqual(self.block._compute_average_response(question, 'id2'), 50)
+        question.get_submission_displays.assert_called_once_with([0.5, 0.25, 0.75])
@@ -175,6 +175,27 @@ class TestMentoringBlock(BlockWithChildrenTestMixin, unittest.TestCase):
         expected.update(shared_data)
         self.assertEqual(block.student_view_data(), expected)
 
+    def test_score_is_computed_once_until_results_change(self):
+        block = MentoringBlock(Mock(), DictFieldData({
+            'student_results': [['q1', {'status': 'correct', 'score': 1}], ['q2', {'status': 'incorrect', 'score': 0}]],
+        }), Mock())
+        question_1, question_2 = Mock(weight=1), Mock(weight=1)
+        question_1.name, question_2.name = 'q1', 'q2'
+        block.steps = [question_1, question_2]
+        block.get_question_number = Mock(side_effect=lambda name: int(name[1:]))
+
+        with patch.object(block, 'answer_mapper', wraps=block.answer_mapper) as patched_answer_mapper:
+            self.assertEqual(block.score.raw, 0.5)
+            block.correct_json()
+            block.incorrect_json()
+            block.partial_json()
+            self.assertEqual(block.score.percentage, 50)
+            self.assertEqual(patched_answer_mapper.call_count, 3)
+
+            block.try_again(Mock(method='POST', body=b'{}'))
+            self.assertEqual(block.score.raw, 0)
+            self.assertEqual(patched_answer_mapper.call_count, 6)
+
 
 @ddt.ddt
 class TestMentoringBlockOptions(unittest.TestCase):
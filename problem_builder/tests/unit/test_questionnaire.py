@@ -0,0 +1,166 @@
+"""
+Unit tests for MCQ and MRQ blocks
+"""
+import unittest
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from xblock.field_data import DictFieldData
+
+from problem_builder.choice import ChoiceBlock
+from problem_builder.mcq import MCQBlock, RatingBlock
+from problem_builder.mrq import MRQBlock
+from problem_builder.tip import TipBlock
+
+
+class TestRenderTips(unittest.TestCase):
+    """
+    Test that tips are rendered once and shared by all students
+    """
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.runtime = Mock()
+        self.runtime.render.side_effect = lambda block, view, context=None: block.mentoring_view(context)
+        self.tips = [
+            self.make_tip('tip1', values=['a'], content='Tip for A', width='200px'),
+            self.make_tip('tip2', values=['a', 'b'], content='Tip for A or B'),
+        ]
+        patcher = patch('problem_builder.questionnaire.QuestionnaireAbstractBlock.get_tips', return_value=self.tips)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_tip(self, usage_id, **fields):
+        return TipBlock(self.runtime, DictFieldData(fields), Mock(usage_id=usage_id))
+
+    def make_mcq(self):
+        return MCQBlock(self.runtime, DictFieldData({'correct_choices': ['a']}), Mock())
+
+    def test_mcq_tips(self):
+        tips = self.make_mcq().calculate_results('a')['tips']
+        self.assertIn('data-width="200px"', tips)
+        self.assertIn('Tip for A', tips)
+        self.assertIn('Tip for A or B', tips)
+        self.assertEqual(self.runtime.render.call_count, 2)
+
+        self.assertEqual(self.make_mcq().calculate_results('a')['tips'], tips)
+        self.assertEqual(self.runtime.render.call_count, 2)
+        self.assertIsNone(self.make_mcq().calculate_results('c')['tips'])
+
+    def test_tips_rerendered_after_edit(self):
+        self.make_mcq().calculate_results('b')
+        self.tips[1].content = 'Edited tip'
+        tips = self.make_mcq().calculate_results('b')['tips']
+        self.assertIn('Edited tip', tips)
+        self.assertEqual(self.runtime.render.call_count, 2)
+
+    def test_mrq_shows_first_tip_per_choice(self):
+        block = MRQBlock(self.runtime, DictFieldData({'required_choices': ['a']}), Mock())
+        choices = [Mock(value=value, content=value) for value in ('a', 'b', 'c')]
+        with patch.object(MRQBlock, 'custom_choices', choices):
+            results = block.calculate_results(['a'])['choices']
+        self.assertIn('Tip for A', results[0]['tips'])
+        self.assertNotIn('Tip for A or B', results[0]['tips'])
+        self.assertIn('Tip for A or B', results[1]['tips'])
+        self.assertEqual(results[2]['tips'].strip(), '')
+
+    def test_mrq_tips_read_from_cache_at_once(self):
+        block = MRQBlock(self.runtime, DictFieldData({'required_choices': ['a']}), Mock())
+        choices = [Mock(value=value, content=value) for value in ('a', 'b', 'c')]
+        with patch.object(MRQBlock, 'custom_choices', choices):
+            block.calculate_results(['a'])
+            with patch('problem_builder.questionnaire.cache') as mock_cache:
+                mock_cache.get_many.side_effect = cache.get_many
+                results = MRQBlock(self.runtime, DictFieldData({}), Mock()).calculate_results(['a'])['choices']
+                mock_cache.get_many.assert_called_once()
+                mock_cache.get.assert_not_called()
+                mock_cache.set_many.assert_not_called()
+                # Tips are only read from the cache once per block
+                block.calculate_results(['b'])
+                mock_cache.get_many.assert_called_once()
+        self.assertIn('Tip for A', results[0]['tips'])
+        self.assertEqual(self.runtime.render.call_count, 2)
+
+
+class TestLastResult(unittest.TestCase):
+    """
+    Test that showing previous results does not submit the answers again
+    """
+    def setUp(self):
+        super().setUp()
+        for module in ('mcq', 'mrq'):
+            patcher = patch(f'problem_builder.{module}.sub_api')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch('problem_builder.questionnaire.QuestionnaireAbstractBlock.get_tips', return_value=[])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_mcq(self):
+        block = MCQBlock(Mock(), DictFieldData({'correct_choices': ['a']}), Mock())
+        with patch.object(MCQBlock, 'create_submission') as create_submission:
+            self.assertEqual(block.submit({'value': 'a'})['status'], 'correct')
+            create_submission.assert_called_once_with('a')
+            self.assertEqual(block.get_last_result()['status'], 'correct')
+            self.assertEqual(create_submission.call_count, 1)
+        self.assertEqual(block.student_choice, 'a')
+
+    def test_mrq(self):
+        block = MRQBlock(Mock(), DictFieldData({'required_choices': ['a']}), Mock())
+        choices = [Mock(value=value, content=value.upper()) for value in ('a', 'b', 'c')]
+        with patch.object(MRQBlock, 'custom_choices', choices), \
+                patch.object(MRQBlock, 'create_submission') as create_submission:
+            self.assertEqual(block.submit(['a', 'c'])['status'], 'partial')
+            create_submission.assert_called_once_with('A, C')
+            self.assertEqual(block.get_last_result()['status'], 'partial')
+            self.assertEqual(create_submission.call_count, 1)
+        self.assertEqual(block.student_choices, ['a', 'c'])
+
+
+class TestChoiceLookups(unittest.TestCase):
+    """
+    Test the lookup tables of the choices and tips of a question
+    """
+    def setUp(self):
+        super().setUp()
+        self.runtime = Mock()
+        blocks = {
+            'choice1': ChoiceBlock(self.runtime, DictFieldData({'value': 'a', 'content': 'Choice A'}), Mock()),
+            'tip1': TipBlock(self.runtime, DictFieldData({'values': ['a', 'b']}), Mock()),
+            'choice2': ChoiceBlock(self.runtime, DictFieldData({'value': 'b', 'content': 'Choice B'}), Mock()),
+            'tip2': TipBlock(self.runtime, DictFieldData({'values': ['b']}), Mock()),
+        }
+        self.runtime.get_block.side_effect = blocks.get
+        self.children = list(blocks)
+        self.choices = [blocks['choice1'], blocks['choice2']]
+        self.tips = [blocks['tip1'], blocks['tip2']]
+        patcher = patch(
+            'problem_builder.questionnaire.child_isinstance',
+            side_effect=lambda block, child_id, cls: isinstance(blocks[child_id], cls),
+        )
+        self.child_isinstance = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookups(self):
+        block = MCQBlock(self.runtime, DictFieldData({'children': self.children}), Mock())
+        self.assertEqual(block.custom_choices, self.choices)
+        self.assertEqual(block.get_tips(), self.tips)
+        self.assertEqual(block.all_choice_values, ['a', 'b'])
+        self.assertEqual(block.tips_by_value, {'a': self.tips[:1], 'b': self.tips})
+        self.assertEqual(block.get_submission_display('b'), 'Choice B')
+        self.assertEqual(block.get_submission_display('c'), 'c')
+        self.assertEqual(
+            block.get_submission_displays(['a', 'c', ['b', 'a', 'c'], 'a']),
+            ['Choice A', 'c', 'Choice B, Choice A, c', 'Choice A']
+        )
+        self.assertFalse(block.has_numeric_answers)
+        self.assertEqual(self.child_isinstance.call_count, 6)  # Each child is only checked once
+        self.assertEqual(self.runtime.get_block.call_count, 4)
+
+    def test_rating_choices(self):
+        block = RatingBlock(self.runtime, DictFieldData({'children': self.children, 'low': 'Low'}), Mock())
+        self.assertEqual(block.all_choice_values, ['1', '2', '3', '4', '5', 'a', 'b'])
+        self.assertEqual(block.human_readable_choices[0], {'display_name': '1 - Low', 'value': '1'})
+        self.assertEqual(block.get_submission_display('3'), '3')
+        self.assertTrue(block.has_numeric_answers)
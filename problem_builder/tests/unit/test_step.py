@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from xblock.field_data import DictFieldData
 
@@ -78,6 +78,25 @@ class TestQuestionMixin(unittest.TestCase):
         self.assertEqual(step1.step_number, 2)
         self.assertEqual(step2.step_number, 1)
 
+    def test_steps_share_the_parent_number_index(self):
+        block = Parent()
+        step1 = Step()
+        step2 = Step()
+        block._set_children_for_test(step1, "2", step2, NotAStep())
+
+        self.assertEqual(block.step_numbers, {0: 1, 2: 2})
+        self.assertIs(step1.sibling_numbers, block.step_numbers)
+        self.assertIs(step2.sibling_numbers, block.step_numbers)
+
+    def test_step_number_raises_for_a_step_missing_from_parent(self):
+        block = Parent()
+        step1 = Step()
+        block._set_children_for_test(step1)
+        step1.scope_ids = Mock(usage_id=5)
+
+        with self.assertRaises(ValueError):
+            step1.step_number  # pylint: disable=pointless-statement
+
     def test_lonely_child_is_true_for_stand_alone_steps(self):
         block = Parent()
         step1 = Step()
@@ -100,3 +119,17 @@ class TestMentoringStep(BlockWithChildrenTestMixin, unittest.TestCase):
     def test_allowed_nested_blocks(self):
         block = MentoringStepBlock(Mock(), DictFieldData({}), Mock())
         self.assert_allowed_nested_blocks(block)
+
+    def test_submit_stores_compact_results(self):
+        block = MentoringStepBlock(Mock(), DictFieldData({}), Mock())
+        question = Mock()
+        question.name = 'mcq_1'
+        question.submit.return_value = {
+            'submission': 'yes', 'status': 'correct', 'score': 1, 'tips': '<div>Tip</div>', 'weight': 1,
+        }
+        block.save = Mock()
+        with patch.object(MentoringStepBlock, 'steps', [question]):
+            response = block.submit({'mcq_1': {'value': 'yes'}})
+
+        self.assertEqual(response['results'], [['mcq_1', question.submit.return_value]])
+        self.assertEqual(block.student_results, [['mcq_1', {'submission': 'yes', 'status': 'correct', 'score': 1}]])
@@ -0,0 +1,138 @@
+"""
+Unit tests for the submissions API integration
+"""
+import unittest
+from unittest.mock import Mock, patch
+
+from django.conf import settings
+from django.test import TestCase
+
+from problem_builder.models import AnswerAggregate
+from problem_builder.sub_api import (SubmittingXBlockMixin,
+                                     batched_submissions,
+                                     get_submission_queryset)
+
+
+class SubmittingBlock(SubmittingXBlockMixin):
+    """ A block that submits answers for a fixed student item """
+    def __init__(self, item_id):
+        self.item_id = item_id
+
+    @property
+    def student_item_key(self):
+        return {'student_id': 'student', 'course_id': 'course', 'item_id': self.item_id, 'item_type': 'pb-mcq'}
+
+
+class TestSubmissionQueryset(unittest.TestCase):
+    """
+    Test choosing the database to read many submissions from
+    """
+    def setUp(self):
+        super().setUp()
+        patcher = patch('problem_builder.sub_api.Submission')
+        self.submission = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_default_database(self):
+        self.assertEqual(get_submission_queryset(), self.submission.objects.all.return_value)
+
+    def test_read_replica(self):
+        with patch.dict(settings.DATABASES, {'read_replica': settings.DATABASES['default']}):
+            self.assertEqual(get_submission_queryset(), self.submission.objects.using.return_value)
+            self.submission.objects.using.assert_called_once_with('read_replica')
+            self.assertEqual(get_submission_queryset(read_replica=False), self.submission.objects.all.return_value)
+
+
+class TestBatchedSubmissions(unittest.TestCase):
+    """
+    Test queueing the submissions of several blocks and writing them together
+    """
+    def setUp(self):
+        super().setUp()
+        patcher = patch('problem_builder.sub_api.sub_api')
+        self.sub_api = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.blocks = [SubmittingBlock('q1'), SubmittingBlock('q2'), Mock()]
+
+    def test_submissions_written_on_exit(self):
+        with batched_submissions(self.blocks):
+            self.blocks[0].create_submission('a')
+            self.blocks[1].create_submission('b', {'item_id': 'other'})
+            self.sub_api.create_submission.assert_not_called()
+
+        self.assertEqual(self.sub_api.create_submission.call_args_list, [
+            ((self.blocks[0].student_item_key, 'a'),),
+            (({'item_id': 'other'}, 'b'),),
+        ])
+        self.blocks[0].create_submission('c')
+        self.assertEqual(self.sub_api.create_submission.call_count, 3)
+
+    def test_submissions_discarded_on_error(self):
+        with self.assertRaises(ValueError):
+            with batched_submissions(self.blocks):
+                self.blocks[0].create_submission('a')
+                raise ValueError
+        self.sub_api.create_submission.assert_not_called()
+        self.assertIsNone(self.blocks[0].pending_submissions)
+
+
+class AggregatingBlock(SubmittingBlock):
+    """ A block whose numeric answers are aggregated """
+    aggregate_answers = True
+
+    def get_submission_display(self, answer):
+        return answer
+
+
+class TestAnswerAggregation(TestCase):
+    """
+    Test keeping the AnswerAggregate of a question up to date as answers are submitted
+    """
+    def setUp(self):
+        super().setUp()
+        patcher = patch('problem_builder.sub_api.sub_api')
+        self.sub_api = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.block = AggregatingBlock('q1')
+
+    def get_aggregate(self):
+        aggregate = AnswerAggregate.objects.get(item_id='q1')
+        return aggregate.num_answers, aggregate.total
+
+    def test_answers_counted_after_commit(self):
+        AnswerAggregate.objects.create(course_key='course', item_id='q1', item_type='pb-mcq', num_answers=1, total=5)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.block.create_submission('3')
+            self.sub_api.get_submissions.assert_not_called()
+            # The student's first answer
+            self.sub_api.get_submissions.return_value = [{'answer': '3'}]
+        self.assertEqual(len(callbacks), 1)
+        self.sub_api.get_submissions.assert_called_once_with(self.block.student_item_key, limit=2)
+        self.assertEqual(self.get_aggregate(), (2, 8))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.block.create_submission('4')
+            self.sub_api.get_submissions.return_value = [{'answer': '4'}, {'answer': '3'}]
+        self.assertEqual(self.get_aggregate(), (2, 9))
+
+    def test_answer_without_aggregate(self):
+        self.sub_api.get_submissions.return_value = [{'answer': '3'}]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.block.create_submission('3')
+        self.sub_api.get_all_submissions.assert_not_called()
+        self.assertFalse(AnswerAggregate.objects.exists())
+
+    def test_rebuild_answer_aggregate(self):
+        self.sub_api.get_all_submissions.return_value = [{'answer': '3'}, {'answer': '5'}, {'answer': 'n/a'}]
+        self.block.rebuild_answer_aggregate(self.block.student_item_key)
+        self.sub_api.get_all_submissions.assert_called_once_with('course', 'q1', 'pb-mcq')
+        self.assertEqual(self.get_aggregate(), (2, 8))
+
+    def test_non_numeric_question(self):
+        self.block.has_numeric_answers = False
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.block.create_submission('Yes')
+        self.assertEqual(callbacks, [])
+        self.sub_api.create_submission.assert_called_once_with(self.block.student_item_key, 'Yes')
+        self.sub_api.get_submissions.assert_not_called()
+        self.assertFalse(AnswerAggregate.objects.exists())
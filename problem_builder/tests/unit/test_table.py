@@ -0,0 +1,83 @@
+"""
+Unit tests for sharing MentoringTableBlock results
+"""
+import json
+from unittest.mock import Mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from xblock.field_data import DictFieldData
+
+from problem_builder.models import Share
+from problem_builder.table import MentoringTableBlock
+
+
+class TestMentoringTableSharing(TestCase):
+    """
+    Test the MentoringTableBlock handlers that manage shares
+    """
+    BLOCK_ID = 'block-v1:edX+DemoX+Demo_Course+type@pb-table+block@table'
+
+    def setUp(self):
+        super().setUp()
+        self.user, self.other_user, self.third_user = [
+            User.objects.create(username=username) for username in ('learner', 'other', 'third')
+        ]
+        self.block = self.make_block(self.user)
+
+    def make_block(self, user):
+        current_user = Mock(opt_attrs={'edx-platform.username': user.username, 'edx-platform.user_id': user.id})
+        runtime = Mock(anonymous_student_id=f'anonymous-{user.username}')
+        runtime.service.return_value.get_current_user.return_value = current_user
+        return MentoringTableBlock(runtime, DictFieldData({}), Mock(usage_id=self.BLOCK_ID))
+
+    def call_handler(self, handler, data):
+        response = handler(Mock(method='POST', body=json.dumps(data).encode('utf-8')))
+        return response.status_code, json.loads(response.body.decode('utf-8'))
+
+    def test_current_user_id(self):
+        self.assertEqual(self.block.current_user_id, self.user.id)
+        self.block.runtime.service.return_value.get_current_user.return_value = Mock(opt_attrs={})
+        del self.block.current_user_id
+        self.assertEqual(self.block.current_user_id, None)  # No user is named "username"
+
+    def test_clear_notification(self):
+        for shared_by in (self.other_user, self.third_user):
+            Share.objects.create(
+                shared_by=shared_by, shared_with=self.user, submission_uid='uid', block_id=self.BLOCK_ID
+            )
+        self.call_handler(self.block.clear_notification, {'usernames': ['other']})
+        self.assertEqual(
+            set(Share.objects.filter(notified=False).values_list('shared_by__username', flat=True)), {'third'}
+        )
+
+    def test_remove_share(self):
+        for shared_with in (self.other_user, self.third_user):
+            Share.objects.create(
+                shared_by=self.user, shared_with=shared_with, submission_uid='uid', block_id=self.BLOCK_ID
+            )
+        self.call_handler(self.block.remove_share, {'username': 'other'})
+        self.assertEqual(list(Share.objects.values_list('shared_with__username', flat=True)), ['third'])
+
+    def test_share_results(self):
+        Share.objects.create(
+            shared_by=self.user, shared_with=self.other_user, submission_uid='uid', block_id=self.BLOCK_ID
+        )
+        with self.assertNumQueries(4):
+            status, response = self.call_handler(
+                self.block.share_results, {'usernames': ['Other', ' third', 'learner', '', 'third']}
+            )
+        self.assertEqual(status, 200)
+        self.assertEqual(response, {})
+        self.assertEqual(
+            sorted(Share.objects.filter(shared_by=self.user).values_list('shared_with__username', 'submission_uid')),
+            [('other', 'uid'), ('third', 'anonymous-learner')]
+        )
+
+    def test_share_results_with_unknown_users(self):
+        status, response = self.call_handler(self.block.share_results, {'usernames': ['nobody', 'third', 'ghost']})
+        self.assertEqual(status, 400)
+        self.assertEqual(
+            response['error'], 'Some users could not be shared with. Please check these usernames: nobody, ghost'
+        )
+        self.assertEqual(list(Share.objects.values_list('shared_with__username', flat=True)), ['third'])
@@ -0,0 +1,414 @@
+"""
+Unit tests for the data export tasks
+"""
+import csv
+import io
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from unittest.mock import Mock, patch
+
+from django.apps.registry import Apps
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, models
+from django.test import TestCase
+from opaque_keys.edx.keys import CourseKey
+
+from problem_builder import sub_api
+
+# The submissions app isn't installed here: register models with the same fields and tables,
+# outside of the project's app registry so that they aren't picked up by its migrations.
+SUBMISSIONS_APPS = Apps()
+
+
+class StudentItem(models.Model):
+    """ A student's item, like `submissions.models.StudentItem` """
+    student_id = models.CharField(max_length=255)
+    course_id = models.CharField(max_length=255)
+    item_id = models.CharField(max_length=255)
+    item_type = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = 'submissions'
+        apps = SUBMISSIONS_APPS
+        db_table = 'submissions_studentitem'
+
+
+class Submission(models.Model):
+    """ A submission to a student item, like `submissions.models.Submission` """
+    student_item = models.ForeignKey(StudentItem, on_delete=models.CASCADE)
+    submitted_at = models.DateTimeField()
+    answer = models.JSONField(db_column='raw_answer')
+
+    class Meta:
+        app_label = 'submissions'
+        apps = SUBMISSIONS_APPS
+        db_table = 'submissions_submission'
+
+
+STUB_MODULES = {
+    name: Mock() for name in (
+        'celery',
+        'celery.utils',
+        'celery.utils.log',
+        'lms',
+        'lms.djangoapps',
+        'lms.djangoapps.instructor_task',
+        'lms.djangoapps.instructor_task.models',
+        'xmodule',
+        'xmodule.modulestore',
+        'xmodule.modulestore.django',
+        'xmodule.modulestore.exceptions',
+    )
+}
+STUB_MODULES['celery'].shared_task = lambda *args, **kwargs: lambda task: task
+STUB_MODULES['xmodule.modulestore.exceptions'].ItemNotFoundError = type('ItemNotFoundError', (Exception,), {})
+ItemNotFoundError = STUB_MODULES['xmodule.modulestore.exceptions'].ItemNotFoundError
+
+with patch.dict('sys.modules', STUB_MODULES):
+    # Modules first imported here are unloaded again on exit, so the real modules it uses must be imported already.
+    from problem_builder import tasks
+
+COURSE_ID = 'course-v1:org+course+run'
+COURSE_KEY = CourseKey.from_string(COURSE_ID)
+ROOT_BLOCK_ID = 'block-v1:org+course+run+type@problem-builder+block@root'
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_block(name, block_type='pb-answer'):
+    """ Make a block stub whose submissions are stored under the item ID `name` """
+    block = Mock(question=f'Question {name}', scope_ids=Mock(block_type=block_type))
+    block.name = name
+    block.scope_ids.usage_id.replace.return_value = name
+    return block
+
+
+class Container:
+    """ A block stub with children """
+    has_children = True
+
+    def __init__(self, block_type, name, children=(), parent=None):
+        self.scope_ids = Mock(block_type=block_type, usage_id=name)
+        self.display_name_with_default = name
+        self.children = [child.scope_ids.usage_id for child in children]
+        self.parent = parent
+        self.runtime = Mock()
+        blocks = {child.scope_ids.usage_id: child for child in children}
+        self.runtime.get_block.side_effect = lambda usage_id: _get_block(blocks, usage_id)
+
+    def get_parent(self):
+        return self.parent
+
+
+class Question(Container):
+    """ A block stub of a type to export """
+    has_children = False
+
+
+def _get_block(blocks, usage_id):
+    """ Look up a block stub like the runtime does """
+    if usage_id not in blocks:
+        raise ItemNotFoundError
+    return blocks[usage_id]
+
+
+def read_csv(data):
+    """ Parse the CSV `data` of a report, without its unicode signature """
+    return list(csv.reader(io.StringIO(data.lstrip('\ufeff'))))
+
+
+class TestExportData(unittest.TestCase):
+    """
+    Test splitting an export into shards
+    """
+    def setUp(self):
+        super().setUp()
+        for name in ('chord', 'delete_export_parts', 'export_shard', 'merge_export', 'modulestore'):
+            patcher = patch.object(tasks, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.blocks = [Question('pb-answer', f'block-v1:org+course+run+type@pb-answer+block@q{index}')
+                       for index in range(3)]
+        self.context_index = {block.scope_ids.usage_id: ('Section', 'Subsection', 'Unit') for block in self.blocks}
+        patcher = patch.object(tasks, 'scan_for_blocks', return_value=(self.blocks, self.context_index))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_export_data(self):
+        task = Mock()
+        task.request.is_eager = False
+        with patch.object(tasks, 'EXPORT_MAX_SHARDS', 2):
+            result = tasks.export_data(task, COURSE_ID, ROOT_BLOCK_ID, None, ['a'], 'match', START.timestamp())
+
+        shard_calls = tasks.export_shard.s.call_args_list
+        self.assertEqual(len(shard_calls), 2)
+        self.assertEqual([call[0][2] for call in shard_calls], [
+            [(block.scope_ids.usage_id, ('Section', 'Subsection', 'Unit')) for block in self.blocks[:2]],
+            [(self.blocks[2].scope_ids.usage_id, ('Section', 'Subsection', 'Unit'))],
+        ])
+        self.assertEqual([call[0][3:] for call in shard_calls], [(['a'], 'match', START.timestamp())] * 2)
+        part_filenames = [call[0][1] for call in shard_calls]
+        self.assertEqual(len(set(part_filenames)), 2)
+        tasks.merge_export.s.assert_called_once()
+        filename, export_id = tasks.merge_export.s.call_args[0][1:3]
+        self.assertEqual(part_filenames, [
+            f'{tasks.EXPORT_FILES_DIR}/{filename}.{export_id}.part{index}' for index in range(2)
+        ])
+        tasks.merge_export.s.return_value.set.assert_called_once_with(task_id=export_id)
+        # The partial reports are deleted if the export fails.
+        tasks.delete_export_parts.s.assert_called_once_with(COURSE_ID, export_id)
+        tasks.merge_export.s.return_value.set.return_value.on_error.assert_called_once_with(
+            tasks.delete_export_parts.s.return_value
+        )
+        self.assertEqual(result, {
+            'error': None,
+            'merge_task_id': tasks.chord.return_value.return_value.id,
+            'shard_task_ids': [tasks.export_shard.s.return_value.set.return_value.id] * 2,
+        })
+
+    def test_split(self):
+        self.assertEqual(tasks._split(list(range(5)), 3), [[0, 1], [2, 3], [4]])
+        self.assertEqual(tasks._split(list(range(2)), 3), [[0], [1]])
+        self.assertEqual(tasks._split([], 3), [[]])
+
+    def test_chunked(self):
+        self.assertEqual(list(tasks._chunked(iter(range(5)), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(tasks._chunked([], 2)), [])
+
+
+class TestExportFiles(unittest.TestCase):
+    """
+    Test writing the partial reports of an export and merging them into the report
+    """
+    def setUp(self):
+        super().setUp()
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.report_store = Mock(storage=FileSystemStorage(location=self.location))
+        self.report_store.path_to.side_effect = self.path_to
+        patcher = patch.object(tasks.ReportStore, 'from_config', return_value=self.report_store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(tasks, 'modulestore')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def path_to(self, course_key, filename):
+        """ Get the path of a file of the course in the report store """
+        self.assertEqual(course_key, COURSE_KEY)
+        return f'course-hash/{filename}'
+
+    def read_report(self, filename):
+        """ Read the rows of a report """
+        with self.report_store.storage.open(self.path_to(COURSE_KEY, filename), 'rb') as report_file:
+            return read_csv(report_file.read().decode('utf-8'))
+
+    def list_files(self, path):
+        """ List the directories and files in a directory of the report store """
+        directories, files = self.report_store.storage.listdir(path)
+        return sorted(directories), sorted(files)
+
+    def export_shard(self, part_filename, rows):
+        with patch.object(tasks, '_generate_rows', return_value=rows):
+            return tasks.export_shard(COURSE_ID, part_filename, [], None, '')
+
+    def test_export(self):
+        rows = [[str(index)] * 9 for index in range(3)] + [['c, "d"'] * 9]
+        part_filenames = [f'{tasks.EXPORT_FILES_DIR}/report.csv.export.part{index}' for index in range(2)]
+        with patch.object(tasks, 'EXPORT_CHUNK_SIZE', 2):
+            shard_results = [
+                self.export_shard(part_filenames[0], rows[:3]),
+                self.export_shard(part_filenames[1], rows[3:]),
+            ]
+            result = tasks.merge_export(shard_results, COURSE_ID, 'report.csv', 'export', 0)
+
+        self.assertEqual(result['report_filename'], 'report.csv')
+        self.assertEqual(result['num_results'], 4)
+        # `ReportStore.store` would load the files into memory.
+        self.report_store.store.assert_not_called()
+        self.assertEqual(result['index_filename'], f'{tasks.EXPORT_FILES_DIR}/report.csv.export{tasks.INDEX_SUFFIX}')
+        # The partial reports are gone, and only the report is in the course directory.
+        self.assertEqual(self.list_files('course-hash'), ([tasks.EXPORT_FILES_DIR], ['report.csv']))
+        self.assertEqual(self.list_files(f'course-hash/{tasks.EXPORT_FILES_DIR}'), ([], ['report.csv.export.idx']))
+        self.assertEqual(self.read_report('report.csv'), [tasks.HEADER_ROW] + rows)
+        read_rows = partial(tasks.read_report_rows, COURSE_KEY, 'report.csv', result['index_filename'])
+        self.assertEqual(read_rows(1, 2), rows[1:3])
+        self.assertEqual(read_rows(2, 5), rows[2:])
+        self.assertEqual(read_rows(4, 5), [])
+
+    def test_stored_names(self):
+        """
+        Check that the names the storage stores files under are used, if they differ from the requested ones.
+        """
+        rows = [['a'] * 9, ['b'] * 9]
+        part_filename = f'{tasks.EXPORT_FILES_DIR}/report.csv.export.part0'
+        self.export_shard(part_filename, [['old'] * 9])
+        self.export_shard(part_filename, [['old'] * 9])
+        self.report_store.storage.save(self.path_to(COURSE_KEY, 'report.csv'), io.BytesIO(b'old'))
+        with patch.object(tasks, 'EXPORT_CHUNK_SIZE', 1):
+            shard_result = self.export_shard(part_filename, rows)
+            result = tasks.merge_export([shard_result], COURSE_ID, 'report.csv', 'export', 0)
+
+        self.assertNotEqual(shard_result['part_filename'], part_filename)
+        self.assertNotEqual(result['report_filename'], 'report.csv')
+        self.assertEqual(self.read_report(result['report_filename']), [tasks.HEADER_ROW] + rows)
+        read_rows = partial(tasks.read_report_rows, COURSE_KEY, result['report_filename'], result['index_filename'])
+        self.assertEqual(read_rows(0, 2), rows)
+
+    def test_delete_export_parts(self):
+        self.export_shard(f'{tasks.EXPORT_FILES_DIR}/report.csv.export.part0', [['a'] * 9])
+        self.export_shard(f'{tasks.EXPORT_FILES_DIR}/report.csv.export.part0', [['a'] * 9])
+        self.export_shard(f'{tasks.EXPORT_FILES_DIR}/report.csv.other.part0', [['a'] * 9])
+        # Celery passes the details of the failure first.
+        tasks.delete_export_parts(Mock(), Mock(), Mock(), COURSE_ID, 'export')
+        self.assertEqual(self.list_files(f'course-hash/{tasks.EXPORT_FILES_DIR}'), ([], [
+            'report.csv.other.part0', 'report.csv.other.part0.idx',
+        ]))
+        # Cancelled exports are cleaned up with only the course and export IDs.
+        tasks.delete_export_parts(COURSE_ID, 'other')
+        self.assertEqual(self.list_files(f'course-hash/{tasks.EXPORT_FILES_DIR}'), ([], []))
+
+
+class TestScanForBlocks(unittest.TestCase):
+    """
+    Test finding the blocks to export, with the names of their section, subsection and unit
+    """
+    def test_scan_for_blocks(self):
+        questions = [Question('pb-mcq', name) for name in ('q1', 'q2', 'q3')]
+        inner_unit = Container('vertical', 'Inner unit', [questions[2]])
+        units = [
+            Container('vertical', 'Unit 1', [questions[0]]),
+            Container('vertical', 'Unit 2', [questions[1], inner_unit]),
+        ]
+        units[0].children.append('missing')
+        section = Container('chapter', 'Section')
+        subsection = Container('sequential', 'Subsection', units, parent=section)
+
+        blocks, context_index = tasks.scan_for_blocks(subsection, (Question,))
+
+        self.assertEqual(blocks, questions)
+        self.assertEqual(context_index, {
+            'q1': ('Section', 'Subsection', 'Unit 1'),
+            'q2': ('Section', 'Subsection', 'Unit 2'),
+            'q3': ('Section', 'Subsection', 'Unit 2'),  # The outermost unit wins
+        })
+
+
+class TestAnswerFilter(unittest.TestCase):
+    """
+    Test which searches are done by the database
+    """
+    def test_long_answer(self):
+        self.assertEqual(tasks._get_answer_filter(make_block('q1'), 'Say "Hi"'), 'Say \\"Hi\\"')
+
+    def test_no_search(self):
+        self.assertIsNone(tasks._get_answer_filter(make_block('q1'), ''))
+        self.assertIsNone(tasks._get_answer_filter(make_block('q1'), None))
+
+    def test_non_ascii_search(self):
+        self.assertIsNone(tasks._get_answer_filter(make_block('q1'), 'café'))
+
+    def test_questionnaire(self):
+        self.assertIsNone(tasks._get_answer_filter(make_block('q1', 'pb-mcq'), 'yes'))
+
+
+class TestSubmissionQueries(TestCase):
+    """
+    Test loading the most recent submissions to export
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Tables can't be created by SQLite within the transaction of the test case.
+        with connection.schema_editor() as editor:
+            editor.create_model(StudentItem)
+            editor.create_model(Submission)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(Submission)
+            editor.delete_model(StudentItem)
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(sub_api, 'Submission', Submission)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            'problem_builder.tasks.get_users_by_anonymous_ids',
+            side_effect=lambda user_ids: {user_id: (f'user-{user_id}', 1, 'N/A') for user_id in user_ids},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('problem_builder.tasks.sub_api')
+        self.sub_api = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, item_id, student_id, answer, days=0, course_id=COURSE_ID):
+        """ Add a submission made `days` after START """
+        student_item, _created = StudentItem.objects.get_or_create(
+            student_id=student_id, course_id=course_id, item_id=item_id, item_type='pb-answer',
+        )
+        Submission.objects.create(student_item=student_item, submitted_at=START + timedelta(days=days), answer=answer)
+
+    def get_submissions(self, **kwargs):
+        return list(tasks._get_submissions(COURSE_ID, make_block('q1'), **kwargs))
+
+    def test_all_submissions(self):
+        self.sub_api.get_all_submissions.return_value = []
+        self.assertEqual(self.get_submissions(), [])
+        self.sub_api.get_all_submissions.assert_called_once_with(COURSE_ID, 'q1', 'pb-answer')
+
+    def test_submitted_after(self):
+        self.submit('q1', 'a', 'old', days=-1)
+        self.submit('q1', 'a', 'new', days=1)
+        self.submit('q1', 'b', 'old', days=-1)
+        self.submit('q2', 'c', 'other question', days=1)
+        self.submit('q1', 'd', 'other course', days=1, course_id='course-v1:org+other+run')
+        self.assertEqual(self.get_submissions(submitted_after=START), [{'student_id': 'a', 'answer': 'new'}])
+
+    def test_match_latest_answers(self):
+        self.submit('q1', 'a', 'Hello', days=1)
+        self.submit('q1', 'a', 'Bye', days=2)
+        self.submit('q1', 'b', 'Bye', days=1)
+        self.submit('q1', 'b', 'I say "hello"', days=2)
+        self.submit('q1', 'c', 'Bye', days=1)
+        self.submit('q1', 'c', 'HELLO', days=1)  # Submitted at the same time, but later
+        self.assertEqual(self.get_submissions(match_string='hello'), [
+            {'student_id': 'b', 'answer': 'I say "hello"'},
+            {'student_id': 'c', 'answer': 'HELLO'},
+        ])
+        self.assertEqual(self.get_submissions(match_string='say "hello'), [
+            {'student_id': 'b', 'answer': 'I say "hello"'},
+        ])
+        self.assertEqual(self.get_submissions(match_string='hello', submitted_after=START + timedelta(days=1)), [
+            {'student_id': 'b', 'answer': 'I say "hello"'},
+        ])
+
+    def test_latest_submissions_of_users(self):
+        self.submit('q1', 'a', 'first', days=1)
+        self.submit('q1', 'a', 'second', days=2)
+        self.submit('q1', 'b', 'old', days=-1)
+        self.submit('q2', 'b', 'answer', days=1)
+        self.submit('q1', 'd', 'not requested', days=1)
+        self.submit('q1', 'c', 'other course', days=1, course_id='course-v1:org+other+run')
+        blocks = [make_block('q1'), make_block('q2')]
+        context_index = {
+            blocks[0].scope_ids.usage_id: ('Section', 'Subsection', 'Unit 1'),
+            blocks[1].scope_ids.usage_id: ('Section', 'Subsection', 'Unit 2'),
+        }
+
+        self.assertEqual(tasks._get_latest_submissions(COURSE_ID, blocks, ['a', 'b', 'c']), {
+            ('q1', 'pb-answer', 'a'): {'student_id': 'a', 'answer': 'second'},
+            ('q1', 'pb-answer', 'b'): {'student_id': 'b', 'answer': 'old'},
+            ('q2', 'pb-answer', 'b'): {'student_id': 'b', 'answer': 'answer'},
+        })
+        rows = tasks._generate_rows(COURSE_ID, blocks, context_index, ['b', 'a', 'c'], '', START)
+        self.assertEqual(list(rows), [
+            ['Section', 'Subsection', 'Unit 1', 'pb-answer', 'Question q1', 'second', 'user-a', 1, 'N/A'],
+            ['Section', 'Subsection', 'Unit 2', 'pb-answer', 'Question q2', 'answer', 'user-b', 1, 'N/A'],
+        ])